@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+columnar_io.py
+
+Typed columnar copies of the derived lineup tables.
+
+Every writer (lineup / individual / pair / trio summaries, progression.csv) still writes
+its rounded CSV, and with write_table also writes an unrounded Parquet (or Feather) file
+next to it with the same stem:
+    Lineup Data/lineup_summary_all_games.csv  ->  Lineup Data/lineup_summary_all_games.parquet
+
+Schema is stable across runs:
+- lineup / player / interval label columns are dictionary-encoded (pandas category)
+- integer columns are int64, everything else numeric is float64
+
+read_table(csv_path) picks the columnar file automatically when it exists and is at
+least as new as the CSV, so downstream loads are fast. By default it applies the CSV's own
+rounding (stored with the columnar copy), so a table reads the same with or without the
+sidecar; round=None keeps full precision (model fits and other library readers use that).
+
+Parquet / Feather need pyarrow; without it only the CSV is written and read.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DICT_COLS = ["lineup", "players", "interval_start", "interval_end"] + [f"player{i}" for i in range(1, 6)]
+FORMATS = {"parquet": ".parquet", "feather": ".feather"}
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def columnar_path(csv_path: str, fmt: str = "parquet") -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {list(FORMATS)}.")
+    root, _ = os.path.splitext(csv_path)
+    return root + FORMATS[fmt]
+
+
+def typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the stable columnar schema (category labels, int64 counts, float64 metrics)."""
+    out = df.copy()
+    for col in out.columns:
+        s = out[col]
+        if col in DICT_COLS:
+            out[col] = s.astype("string").astype("category")
+        elif pd.api.types.is_bool_dtype(s):
+            continue
+        elif pd.api.types.is_integer_dtype(s):
+            out[col] = s.astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype(np.float64)
+    return out.reset_index(drop=True)
+
+
+def write_table(
+    df: pd.DataFrame,
+    csv_path: str,
+    round_csv: Optional[Union[int, Dict[str, int]]] = None,
+    fmt: Optional[str] = "parquet",
+) -> None:
+    """
+    Write the (optionally rounded) CSV plus an unrounded typed columnar copy.
+
+    round_csv: decimals (int or per-column dict) applied to the CSV only.
+    fmt: "parquet", "feather" or None for CSV only.
+    """
+    csv_df = df.round(round_csv) if round_csv is not None else df
+    csv_df.to_csv(csv_path, index=False)
+
+    if fmt is None:
+        return
+    if not _has_pyarrow():
+        print(f"pyarrow not installed; wrote {csv_path} only (no {fmt} copy).")
+        return
+
+    path = columnar_path(csv_path, fmt)
+    table = typed(df)
+    table.attrs["round_csv"] = round_csv  # read_table re-applies it by default
+    if fmt == "parquet":
+        table.to_parquet(path, index=False)
+    else:
+        table.to_feather(path)
+
+
+def read_table(csv_path: str, round: Optional[Union[str, int, Dict[str, int]]] = "csv") -> pd.DataFrame:
+    """
+    Read the columnar copy of csv_path when it exists and is current, else the CSV.
+
+    round: "csv" rounds the columnar copy like the CSV it stands in for; None keeps full
+      precision; an int or per-column dict rounds either source to that.
+    """
+    if _has_pyarrow():
+        csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else -np.inf
+        for fmt in FORMATS:
+            path = columnar_path(csv_path, fmt)
+            if os.path.exists(path) and os.path.getmtime(path) >= csv_mtime:
+                df = pd.read_parquet(path) if fmt == "parquet" else pd.read_feather(path)
+                decimals = df.attrs.get("round_csv") if round == "csv" else round
+                return df.round(decimals) if decimals is not None else df
+    df = pd.read_csv(csv_path)
+    return df.round(round) if round not in ("csv", None) else df
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+heatmap_batch.py
+
+Headless batch rendering of the lineup progression heatmaps for weekly reports.
+
+Same figures as lineup_progression_heatmaps.ipynb (top lineups per interval, low-minute cells
+masked, one heatmap per metric) but:
+- Agg backend, written straight to PNG / SVG
+- one pivot per (team, interval spec): every metric is pivoted in a single pivot_table call
+- figures fan out across a process pool
+- each figure's input data is hashed; unchanged figures are skipped (manifest.json in out_dir)
+
+Call:
+    from heatmap_batch import build_progressions, render_report
+    progs = build_progressions("Game Recaps", "*.csv", interval_specs=["3,2,2", "4,3"])
+    render_report(progs, out_dir="reports/heatmaps")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from matplotlib.colors import TwoSlopeNorm  # noqa: E402
+
+# (metric, title, colorbar label, number format, color center)
+METRICS: List[Tuple[str, str, str, str, Optional[float]]] = [
+    ("minutes", "Minutes Played (Top Lineups)", "minutes", ".1f", None),
+    ("rel_PM_p40", "Relative Plus-Minus per 40 (Top Lineups)", "rel_PM_p40", ".2f", 0.0),
+    ("rel_net_rtg", "Relative Net Rating (Top Lineups)", "rel_net_rtg", ".2f", 0.0),
+    ("off_rtg", "Offensive Rating (Top Lineups)", "off_rtg", ".2f", None),
+    ("def_rtg", "Defensive Rating (Top Lineups)", "def_rtg", ".2f", None),
+]
+
+MANIFEST = "manifest.json"
+
+
+def build_progressions(
+    input_dir: str,
+    pattern: str,
+    interval_specs: Sequence[str],
+    team_ids: Optional[Iterable[Optional[int]]] = None,
+) -> Dict[Tuple[Hashable, str], pd.DataFrame]:
+    """progressionbuilder output for every (team, interval spec), without writing CSVs."""
+    import progressionbuilder as pb
+
+    out = {}
+    for team_id in team_ids if team_ids is not None else [None]:
+        for spec in interval_specs:
+            out[(team_id if team_id is not None else "team", spec)] = pb.build_progression_csv(
+                input_dir, pattern, spec, output_path=None, team_id=team_id
+            )
+    return out
+
+
+def top_lineups(prog: pd.DataFrame, top_n: int = 4) -> List[str]:
+    """Union of the top N lineups by minutes in each interval, sorted by total minutes."""
+    ranked = prog.sort_values(["interval_num", "minutes"], ascending=[True, False])
+    union = ranked.groupby("interval_num").head(top_n)["lineup"].astype(str).unique()
+    totals = prog.groupby(prog["lineup"].astype(str))["minutes"].sum()
+    return totals.loc[list(union)].sort_values(ascending=False).index.tolist()
+
+
+def pivot_all(prog: pd.DataFrame, lineups: List[str], metrics: Sequence[str]) -> pd.DataFrame:
+    """
+    One pivot for every metric: rows = lineup label "(total minutes)", columns = (metric, interval).
+    """
+    sub = prog[prog["lineup"].astype(str).isin(lineups)].copy()
+    sub["lineup"] = sub["lineup"].astype(str)
+    totals = prog.groupby(prog["lineup"].astype(str))["minutes"].sum()
+    labels = {lu: f"{lu.upper()}-({totals[lu]:.1f})" for lu in lineups}
+
+    piv = sub.pivot_table(index="lineup", columns="interval_num", values=list(set(metrics) | {"minutes"}), aggfunc="first")
+    piv = piv.reindex(lineups)
+    piv.index = [labels[lu] for lu in piv.index]
+    return piv.sort_index(axis=1)
+
+
+def _data_hash(data: pd.DataFrame, extra: str) -> str:
+    h = hashlib.sha1(extra.encode("utf-8"))
+    h.update(np.ascontiguousarray(data.to_numpy(dtype=float)).tobytes())
+    h.update("|".join(map(str, data.index)).encode("utf-8"))
+    h.update("|".join(map(str, data.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _render(job: dict) -> str:
+    """Draw one heatmap to job['path'] (runs in a worker process)."""
+    data: pd.DataFrame = job["data"]
+    arr = data.to_numpy(dtype=float)
+    center = job["center"]
+
+    fig, ax = plt.subplots(figsize=(max(8, 1.6 * (data.shape[1] + 1)), max(5, 0.6 * (data.shape[0] + 2))))
+    if center is None or np.all(np.isnan(arr)):
+        im = ax.imshow(arr, aspect="auto", cmap=job["cmap"])
+    else:
+        vmin, vmax = np.nanmin(arr), np.nanmax(arr)
+        vmin, vmax = min(vmin, center - 1e-9), max(vmax, center + 1e-9)
+        im = ax.imshow(arr, aspect="auto", cmap=job["cmap"], norm=TwoSlopeNorm(vmin=vmin, vcenter=center, vmax=vmax))
+
+    ax.set_title(job["title"], pad=16)
+    ax.set_xlabel("Interval")
+    ax.set_ylabel("Lineup (Total Minutes)")
+    ax.set_xticks(np.arange(data.shape[1]), labels=[str(c) for c in data.columns])
+    ax.set_yticks(np.arange(data.shape[0]), labels=data.index)
+
+    for i in range(arr.shape[0]):
+        for j in range(arr.shape[1]):
+            val = arr[i, j]
+            ax.text(j, i, "" if np.isnan(val) else format(val, job["fmt"]), ha="center", va="center", fontsize=9)
+
+    fig.colorbar(im, ax=ax).set_label(job["cbar"])
+    fig.tight_layout()
+    fig.savefig(job["path"])
+    plt.close(fig)
+    return job["path"]
+
+
+def _slug(value) -> str:
+    return "".join(c if c.isalnum() else "_" for c in str(value)).strip("_")
+
+
+def render_report(
+    progressions: Dict[Tuple[Hashable, str], pd.DataFrame],
+    out_dir: str = "reports/heatmaps",
+    metrics: Sequence[Tuple[str, str, str, str, Optional[float]]] = METRICS,
+    top_n: int = 4,
+    min_minutes_cell: float = 4.0,
+    fmt: str = "png",
+    cmap: str = "RdYlGn",
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> pd.DataFrame:
+    """
+    Render every metric for every (team, interval spec) progression.
+
+    Returns one row per figure with its path and whether it was rendered or skipped.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    jobs, log = [], []
+    for (team, spec), prog in progressions.items():
+        if prog is None or prog.empty:
+            continue
+        lineups = top_lineups(prog, top_n=top_n)
+        piv = pivot_all(prog, lineups, [m[0] for m in metrics])
+        valid = piv["minutes"].ge(min_minutes_cell)
+
+        for metric, title, cbar, num_fmt, center in metrics:
+            data = piv[metric].reindex(columns=valid.columns).where(valid)
+            name = f"{_slug(team)}_{_slug(spec)}_{_slug(metric)}.{fmt}"
+            path = os.path.join(out_dir, name)
+            full_title = f"{title} - {team} [{spec}]"
+            digest = _data_hash(data, f"{full_title}|{num_fmt}|{center}|{cmap}")
+
+            if manifest.get(name) == digest and os.path.exists(path):
+                log.append({"team": team, "intervals": spec, "metric": metric, "path": path, "status": "skipped"})
+                continue
+            manifest[name] = digest
+            jobs.append({"data": data, "title": full_title, "cbar": cbar, "fmt": num_fmt, "center": center, "cmap": cmap, "path": path})
+            log.append({"team": team, "intervals": spec, "metric": metric, "path": path, "status": "rendered"})
+
+    if jobs:
+        if workers == 1 or len(jobs) == 1:
+            for job in jobs:
+                _render(job)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_render, jobs))
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return pd.DataFrame(log)
+
+
+if __name__ == "__main__":
+    progs = build_progressions("Game Recaps", "*.csv", interval_specs=["3,2,2"])
+    report = render_report(progs, out_dir="Lineup Data/heatmaps")
+    print(report["status"].value_counts())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+lineup_clusters.py
+
+Stylistic lineup archetypes from the four-factor columns process_lineups computes:
+    o_eFG%, o_TOV%, o_orbR, o_ftaR, d_eFG%, d_TOV%, d_orbR, d_ftaR
+
+- features are standardized with possession-weighted means / stds
+- mini-batch k-means (numpy): batches are drawn with probability proportional to
+  possessions and every lineup's pull on its center is possession-weighted, so 2-possession
+  lineups with 150% eFG don't become their own archetype
+- fits are cached per dataset hash (features + weights + params) in cache_dir
+- assign_clusters labels new lineups against a fitted model without refitting
+
+Call:
+    from columnar_io import read_table
+    from lineup_clusters import fit_clusters, assign_clusters, cluster_profiles
+
+    lineups = read_table("Lineup Data/lineup_summary_all_games.csv", round=None)
+    model = fit_clusters(lineups, k=6)
+    lineups["cluster"] = assign_clusters(model, lineups)
+    cluster_profiles(model, lineups)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+FOUR_FACTORS = ["o_eFG%", "o_TOV%", "o_orbR", "o_ftaR", "d_eFG%", "d_TOV%", "d_orbR", "d_ftaR"]
+
+
+@dataclass(frozen=True)
+class ClusterModel:
+    features: List[str]
+    mean: np.ndarray
+    std: np.ndarray
+    centers: np.ndarray  # (k, n_features), standardized space
+    inertia: float
+    dataset_hash: str
+
+
+def _matrix(df: pd.DataFrame, features: Sequence[str], weight: str, min_poss: float):
+    # lineups without a shot / possession have undefined rates and can't be placed in the fit
+    df = df[(df[weight] >= min_poss) & df[list(features)].notna().all(axis=1)]
+    X = df[list(features)].to_numpy(dtype=float)
+    w = df[weight].to_numpy(dtype=float)
+    return X, w, df.index
+
+
+def _hash(X: np.ndarray, w: np.ndarray, params: str) -> str:
+    h = hashlib.sha1(params.encode("utf-8"))
+    h.update(np.ascontiguousarray(X).tobytes())
+    h.update(np.ascontiguousarray(w).tobytes())
+    return h.hexdigest()
+
+
+def _nearest(Z: np.ndarray, centers: np.ndarray) -> tuple:
+    # squared distances via |z|^2 - 2 z.c + |c|^2, chunk-free for (n x k) with small k
+    d2 = (Z ** 2).sum(axis=1)[:, None] - 2 * Z @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    labels = d2.argmin(axis=1)
+    return labels, np.maximum(d2[np.arange(len(Z)), labels], 0.0)
+
+
+def _init_plus_plus(Z: np.ndarray, w: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Weighted k-means++ seeding on a weight-proportional sample (keeps init O(sample * k))."""
+    # only positive-weight rows can be drawn without replacement (min_poss=0 lets zero weights in)
+    pos = np.flatnonzero(w > 0)
+    size = min(len(pos), max(10 * k, 2048))
+    sample = pos[rng.choice(len(pos), size=size, replace=False, p=w[pos] / w[pos].sum())]
+    S, sw = Z[sample], w[sample]
+    centers = [S[rng.choice(len(S), p=sw / sw.sum())]]
+    d2 = ((S - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        p = sw * d2
+        idx = rng.choice(len(S), p=p / p.sum()) if p.sum() > 0 else rng.integers(len(S))
+        centers.append(S[idx])
+        d2 = np.minimum(d2, ((S - S[idx]) ** 2).sum(axis=1))
+    return np.array(centers)
+
+
+def fit_clusters(
+    lineups: pd.DataFrame,
+    k: int = 6,
+    features: Sequence[str] = FOUR_FACTORS,
+    weight: str = "poss_total",
+    min_poss: float = 1.0,
+    batch_size: int = 1024,
+    n_iter: int = 200,
+    seed: int = 0,
+    cache_dir: Optional[str] = "Lineup Data/cluster_cache",
+) -> ClusterModel:
+    """
+    Possession-weighted mini-batch k-means over lineup four-factor profiles.
+
+    min_poss: lineups below this many possessions are left out of the fit (they can still be assigned).
+    cache_dir: where fitted models are cached by dataset hash; None disables caching.
+    """
+    X, w, _ = _matrix(lineups, features, weight, min_poss)
+    if len(X) < k:
+        raise ValueError(f"Need at least k={k} lineups with >= {min_poss} possessions, found {len(X)}.")
+
+    params = f"{list(features)}|{weight}|{min_poss}|{k}|{batch_size}|{n_iter}|{seed}"
+    digest = _hash(X, w, params)
+    cache_path = os.path.join(cache_dir, f"{digest}.npz") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        c = np.load(cache_path)
+        return ClusterModel(list(features), c["mean"], c["std"], c["centers"], float(c["inertia"]), digest)
+
+    mean = np.average(X, axis=0, weights=w)
+    std = np.sqrt(np.average((X - mean) ** 2, axis=0, weights=w))
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+
+    rng = np.random.default_rng(seed)
+    centers = _init_plus_plus(Z, w, k, rng)
+    counts = np.zeros(k)
+    p = w / w.sum()
+
+    for _ in range(n_iter):
+        batch = rng.choice(len(Z), size=min(batch_size, len(Z)), p=p)
+        Zb = Z[batch]
+        labels, _ = _nearest(Zb, centers)
+        # per-center learning rate 1 / (points seen); batch drawn ~ weight, so each point counts once
+        batch_counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, Zb)
+        seen = batch_counts > 0
+        counts[seen] += batch_counts[seen]
+        eta = (batch_counts[seen] / counts[seen])[:, None]
+        centers[seen] = (1 - eta) * centers[seen] + eta * (sums[seen] / batch_counts[seen][:, None])
+
+    _, d2 = _nearest(Z, centers)
+    inertia = float((w * d2).sum())
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_path, mean=mean, std=std, centers=centers, inertia=inertia)
+    return ClusterModel(list(features), mean, std, centers, inertia, digest)
+
+
+def assign_clusters(model: ClusterModel, lineups: pd.DataFrame) -> pd.Series:
+    """
+    Nearest-center cluster for each lineup row (no refit); incremental for newly ingested lineups.
+    Rows with a missing four-factor value get -1.
+    """
+    X = lineups[model.features].to_numpy(dtype=float)
+    ok = ~np.isnan(X).any(axis=1)
+    labels = np.full(len(X), -1, dtype=np.int64)
+    labels[ok], _ = _nearest((X[ok] - model.mean) / model.std, model.centers)
+    return pd.Series(labels, index=lineups.index, name="cluster")
+
+
+def cluster_profiles(model: ClusterModel, lineups: pd.DataFrame, weight: str = "poss_total") -> pd.DataFrame:
+    """Possession-weighted four-factor profile, lineup count and possessions per cluster."""
+    labels = assign_clusters(model, lineups).to_numpy()
+    ok = labels >= 0
+    labels = labels[ok]
+    w = lineups[weight].to_numpy(dtype=float)[ok]
+    X = lineups[model.features].to_numpy(dtype=float)[ok]
+
+    k = len(model.centers)
+    wsum = np.bincount(labels, weights=w, minlength=k)
+    prof = np.zeros((k, len(model.features)))
+    np.add.at(prof, labels, X * w[:, None])
+    prof = prof / np.where(wsum > 0, wsum, np.nan)[:, None]
+
+    out = pd.DataFrame(prof, columns=model.features)
+    out.insert(0, "possessions", wsum)
+    out.insert(0, "n_lineups", np.bincount(labels, minlength=k))
+    out.index.name = "cluster"
+    return out.reset_index()
+
+
+if __name__ == "__main__":
+    from columnar_io import read_table
+
+    lineups = read_table("Lineup Data/lineup_summary_all_games.csv", round=None)
+    model = fit_clusters(lineups, k=4)
+    print(cluster_profiles(model, lineups).round(3))
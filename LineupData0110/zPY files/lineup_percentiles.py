@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+lineup_percentiles.py
+
+League-wide percentiles for aggregated lineup metrics (the raw stints ship vendor
+netpppPctile / opppPctile / dpppPctile, the lineup summaries have nothing comparable).
+
+PercentileIndex keeps, per metric, a sorted array of the league's values and the
+cumulative (optionally possession) weight behind them:
+- percentile of one value: two binary searches
+- percentile columns for a whole table: one vectorized searchsorted pass per metric
+- update(): re-ingested lineups replace their old values without a rebuild -- the old
+  value is inserted again with negative weight, so cumulative weights stay exact
+
+Percentiles are 0-1 (mid-rank: half of the ties count as below), like the vendor columns.
+For metrics where lower is better (def_rtg, o_TOV%, ...) the scale is flipped so 1.0 is
+always best.
+
+Call:
+    from columnar_io import read_table
+    from lineup_percentiles import PercentileIndex
+
+    league = read_table("Lineup Data/lineup_summary_all_games.csv", round=None)
+    idx = PercentileIndex(league, weighted=True, min_poss=20)
+    idx.annotate(league)                  # adds net_rtg_pctile, off_rtg_pctile, ...
+    idx.percentile("net_rtg", 12.5)
+    idx.update(new_week_lineups)          # same key (lineup) -> value replaced
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+METRICS = [
+    "net_rtg", "off_rtg", "def_rtg", "PM_p40",
+    "o_eFG%", "o_TOV%", "o_orbR", "o_ftaR",
+    "d_eFG%", "d_TOV%", "d_orbR", "d_ftaR",
+]
+LOWER_IS_BETTER = {"def_rtg", "o_TOV%", "d_eFG%", "d_orbR", "d_ftaR"}
+
+
+class _SortedWeights:
+    """Sorted values with per-entry weights; negative entries cancel earlier ones."""
+
+    def __init__(self):
+        self.values = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.cum = np.zeros(0)
+        self._retired = 0  # negative entries since the last compaction
+
+    def insert(self, values: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(values, kind="mergesort")
+        values, weights = values[order], weights[order]
+        pos = np.searchsorted(self.values, values, side="right")
+        self.values = np.insert(self.values, pos, values)
+        self.weights = np.insert(self.weights, pos, weights)
+        # retired entries accumulate as +w / -w pairs; collapse them once they dominate
+        self._retired += int(np.count_nonzero(weights < 0))
+        if len(self.values) > 64 and 4 * self._retired > len(self.values):
+            self._compact()
+        self.cum = np.cumsum(self.weights)
+
+    def _compact(self) -> None:
+        uniq, inv = np.unique(self.values, return_inverse=True)
+        w = np.bincount(inv, weights=self.weights)
+        keep = ~np.isclose(w, 0.0)
+        self.values, self.weights = uniq[keep], w[keep]
+        self._retired = 0
+
+    @property
+    def total(self) -> float:
+        return float(self.cum[-1]) if len(self.cum) else 0.0
+
+    def rank(self, x: np.ndarray) -> np.ndarray:
+        """Mid-rank fraction of weight below x."""
+        if self.total <= 0:
+            return np.full(len(x), np.nan)
+        cum = np.r_[0.0, self.cum]
+        below = cum[np.searchsorted(self.values, x, side="left")]
+        at_or_below = cum[np.searchsorted(self.values, x, side="right")]
+        out = (below + at_or_below) / 2 / self.total
+        return np.where(np.isnan(x), np.nan, out)
+
+
+class PercentileIndex:
+    """
+    Percentile reference built from league lineup tables.
+
+    weighted: weight each lineup by `weight` (possessions) instead of counting lineups equally.
+    min_poss: lineups below this many possessions stay out of the reference population
+      (they can still be looked up / annotated).
+    key_cols: columns identifying a lineup across updates (add teamId / season for league tables).
+    """
+
+    def __init__(
+        self,
+        lineups: Optional[pd.DataFrame] = None,
+        metrics: Sequence[str] = METRICS,
+        weighted: bool = False,
+        weight: str = "poss_total",
+        min_poss: float = 0.0,
+        key_cols: Sequence[str] = ("lineup",),
+    ):
+        self.metrics: List[str] = list(metrics)
+        self.weighted = weighted
+        self.weight = weight
+        self.min_poss = min_poss
+        self.key_cols = list(key_cols)
+        self._arrays: Dict[str, _SortedWeights] = {m: _SortedWeights() for m in self.metrics}
+        self._current = pd.DataFrame(columns=self.metrics + ["_w"])  # indexed by key: what's in the arrays now
+        if lineups is not None:
+            self.update(lineups)
+
+    def _keys(self, df: pd.DataFrame) -> pd.Index:
+        if len(self.key_cols) == 1:
+            return pd.Index(df[self.key_cols[0]].astype(str))
+        return pd.MultiIndex.from_frame(df[self.key_cols].astype(str))
+
+    def update(self, lineups: pd.DataFrame) -> None:
+        """Insert new lineups; lineups whose key is already indexed have their old values replaced."""
+        poss = lineups[self.weight].to_numpy(dtype=float)
+        rows = pd.DataFrame(
+            lineups[self.metrics].to_numpy(dtype=float),
+            index=self._keys(lineups),
+            columns=self.metrics,
+        )
+        rows["_w"] = np.where(poss >= self.min_poss, poss if self.weighted else 1.0, 0.0)
+        rows = rows[~rows.index.duplicated(keep="last")]
+
+        old = self._current.reindex(rows.index[rows.index.isin(self._current.index)])
+        for m in self.metrics:
+            vals = np.r_[old[m].to_numpy(dtype=float), rows[m].to_numpy(dtype=float)]
+            wts = np.r_[-old["_w"].to_numpy(dtype=float), rows["_w"].to_numpy(dtype=float)]
+            ok = ~np.isnan(vals) & (wts != 0)
+            self._arrays[m].insert(vals[ok], wts[ok])
+
+        kept = self._current[~self._current.index.isin(rows.index)]
+        self._current = rows if kept.empty else pd.concat([kept, rows])
+
+    def percentile(self, metric: str, value) -> np.ndarray:
+        """Percentile (0-1, 1 = best) of one value or an array of values for `metric`."""
+        x = np.atleast_1d(np.asarray(value, dtype=float))
+        p = self._arrays[metric].rank(x)
+        if metric in LOWER_IS_BETTER:
+            p = 1.0 - p
+        return p if np.ndim(value) else p[0]
+
+    def annotate(self, lineups: pd.DataFrame, suffix: str = "_pctile") -> pd.DataFrame:
+        """Copy of `lineups` with a percentile column per indexed metric."""
+        out = lineups.copy()
+        for m in self.metrics:
+            if m in out.columns:
+                out[m + suffix] = self.percentile(m, out[m].to_numpy(dtype=float))
+        return out
+
+    def __len__(self) -> int:
+        return int((self._current["_w"] > 0).sum())
+
+
+if __name__ == "__main__":
+    from columnar_io import read_table
+
+    league = read_table("Lineup Data/lineup_summary_all_games.csv", round=None)
+    idx = PercentileIndex(league, weighted=True, min_poss=10)
+    cols = ["lineup", "poss_total", "net_rtg", "net_rtg_pctile", "def_rtg", "def_rtg_pctile"]
+    print(idx.annotate(league)[cols].head(10).round(3))
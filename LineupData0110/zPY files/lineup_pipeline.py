@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+lineup_pipeline.py
+
+In-process version of the script chain
+    updated_lineups -> lineup_summary_all_games.csv -> updated_individual / updated_combos
+with DataFrames handed straight from stage to stage instead of through disk:
+
+    stints -> lineups -> individuals
+                      -> combos (pairs, trios, ...)
+    progression (interval summaries straight from the game files)
+
+Every stage result is memoized under a key hashed from its parameters and its upstream
+stage's key. The Game Recaps folder enters the keys through a (path, size, mtime) signature
+of its CSVs, so editing / adding a game file invalidates everything downstream of it, while
+changing e.g. min_minutes only recomputes the combos stage.
+
+Results are shared with the cache: copy before mutating them.
+
+Call:
+    from lineup_pipeline import LineupPipeline
+
+    pipe = LineupPipeline("Game Recaps")
+    lineups = pipe.lineups()
+    pairs = pipe.combos(combo_size=2, min_minutes=10)
+    trios = pipe.combos(combo_size=3, min_minutes=10)     # reuses the cached lineups
+    players = pipe.individuals(games=["241220", "241221"])
+    prog = pipe.progression("3,2,2")
+    pipe.export()                                        # same files the scripts write
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+import progressionbuilder as pb
+import updated_combos as uc
+import updated_individual as ui
+import updated_lineups as ul
+from columnar_io import write_table
+
+COMBO_NAMES = {2: "pair", 3: "trio", 4: "quad", 5: "five"}
+
+
+def _key(stage: str, **params: Any) -> str:
+    blob = json.dumps({"stage": stage, **params}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class LineupPipeline:
+    """
+    Memoized lineup stages over one Game Recaps folder.
+
+    base_dir: folder of raw stint CSVs (same as updated_lineups.process_lineups).
+    recursive: also read CSVs in subfolders.
+    """
+
+    def __init__(self, base_dir: str = "Game Recaps", recursive: bool = False):
+        self.base_dir = base_dir
+        self.recursive = recursive
+        self._cache: Dict[str, Any] = {}
+        self.computed: List[str] = []  # stage names in the order they were (re)computed
+
+    # ---- cache plumbing ----
+    def source_signature(self) -> str:
+        """Cheap fingerprint of the input folder: every CSV's relative path, size and mtime."""
+        base = Path(self.base_dir)
+        paths = base.rglob("*.csv") if self.recursive else base.glob("*.csv")
+        entries = []
+        for p in sorted(paths):
+            st = p.stat()
+            entries.append((str(p.relative_to(base)), st.st_size, st.st_mtime_ns))
+        return _key("source", entries=entries)
+
+    def _memo(self, stage: str, key: str, build: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = build()
+            self.computed.append(stage)
+        return self._cache[key]
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @staticmethod
+    def _games(games: Optional[Iterable[str]]) -> Optional[List[str]]:
+        return sorted(g.lower() for g in games) if games else None
+
+    # ---- stages ----
+    def _stints_key(self, games, team_id) -> str:
+        return _key("stints", source=self.source_signature(), games=self._games(games), team_id=team_id)
+
+    def stints(self, games: Optional[Iterable[str]] = None, team_id: Optional[int] = None) -> pd.DataFrame:
+        """Raw stint rows with lineup / lineup_code columns (deduplicated, optionally one team)."""
+        games = self._games(games)
+
+        def build():
+            raw = ul.load_game_recaps(self.base_dir, games=games, recursive=self.recursive)
+            if raw.empty:
+                return raw
+            if team_id is not None:
+                raw = raw[raw["teamId"] == team_id]
+            return ul.add_lineup_codes(raw.reset_index(drop=True))
+
+        return self._memo("stints", self._stints_key(games, team_id), build)
+
+    def _lineups_key(self, games, team_id) -> str:
+        return _key("lineups", upstream=self._stints_key(games, team_id))
+
+    def lineups(self, games: Optional[Iterable[str]] = None, team_id: Optional[int] = None) -> pd.DataFrame:
+        """Unrounded lineup summary (updated_lineups.summarize_stints)."""
+        def build():
+            raw = self.stints(games, team_id)
+            if raw.empty:
+                return pd.DataFrame()
+            return ul.summarize_stints(raw, decimals=None)
+
+        return self._memo("lineups", self._lineups_key(games, team_id), build)
+
+    def individuals(self, games: Optional[Iterable[str]] = None, team_id: Optional[int] = None) -> pd.DataFrame:
+        """Unrounded individual summary (updated_individual.individual_summary)."""
+        def build():
+            lineups = self.lineups(games, team_id)
+            return pd.DataFrame() if lineups.empty else ui.individual_summary(lineups)
+
+        key = _key("individuals", upstream=self._lineups_key(games, team_id))
+        return self._memo("individuals", key, build)
+
+    def combos(
+        self,
+        combo_size: int = 2,
+        min_minutes: Optional[float] = 10,
+        games: Optional[Iterable[str]] = None,
+        team_id: Optional[int] = None,
+    ) -> Optional[pd.DataFrame]:
+        """N-player combo table (updated_combos.combo_summary)."""
+        def build():
+            lineups = self.lineups(games, team_id)
+            return None if lineups.empty else uc.combo_summary(lineups, combo_size=combo_size, min_minutes=min_minutes)
+
+        key = _key("combos", upstream=self._lineups_key(games, team_id), combo_size=combo_size, min_minutes=min_minutes)
+        return self._memo("combos", key, build)
+
+    def progression(self, intervals_str: str = "3,2,3", pattern: str = "*.csv", team_id: Optional[int] = None) -> pd.DataFrame:
+        """Interval progression table (progressionbuilder.build_progression_csv, nothing written)."""
+        key = _key("progression", source=self.source_signature(), intervals=intervals_str, pattern=pattern, team_id=team_id)
+        return self._memo(
+            "progression",
+            key,
+            lambda: pb.build_progression_csv(self.base_dir, pattern, intervals_str, output_path=None, team_id=team_id),
+        )
+
+    # ---- output ----
+    def export(
+        self,
+        out_dir: str = "Lineup Data",
+        games: Optional[Iterable[str]] = None,
+        team_id: Optional[int] = None,
+        combo_sizes: Iterable[int] = (2, 3),
+        min_minutes: Optional[float] = 10,
+    ) -> List[str]:
+        """Write the lineup / individual / combo files the standalone scripts produce (from the cache)."""
+        os.makedirs(out_dir, exist_ok=True)
+        written = []
+
+        lineups = self.lineups(games, team_id)
+        if lineups.empty:
+            return written
+        path = os.path.join(out_dir, "lineup_summary_all_games.csv")
+        write_table(lineups, path, round_csv=3)
+        written.append(path)
+
+        path = os.path.join(out_dir, "individual_summary_all_games.csv")
+        write_table(self.individuals(games, team_id), path, round_csv=ui.INDIVIDUAL_ROUNDING)
+        written.append(path)
+
+        for size in combo_sizes:
+            combos = self.combos(size, min_minutes, games, team_id)
+            if combos is None:
+                continue
+            path = os.path.join(out_dir, f"{COMBO_NAMES[size]}_analysis_all_games.csv")
+            write_table(combos, path)
+            uc.save_combo_index(uc.build_combo_index(combos, size), uc.combo_index_path(path), len(combos), source=path)
+            written.append(path)
+        return written
+
+
+if __name__ == "__main__":
+    pipe = LineupPipeline("Game Recaps")
+    print(pipe.lineups().head())
+    print(pipe.combos(2).head())
+    print(pipe.combos(3).head())
+    print("computed:", pipe.computed)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+oncourt_intervals.py
+
+"Who was on the floor at time t" from RAW stint-level lineup data.
+
+Within one game and team, stints are non-overlapping [sStart, sEnd) intervals in game
+seconds, so sorted start / end endpoint arrays are enough for an interval index:
+- point query: last stint whose start <= t (searchsorted on starts), checked against its end
+- range query: stints with start < t1 and end > t0 (two searchsorted calls)
+- bulk join: every (game, team) is laid out on one global time axis (block offset + seconds),
+  so a whole table of external events is matched with a single searchsorted pass.
+
+Times can be given as game seconds or as period + clock remaining ("3:12" of Q4);
+period start / length come from the stints themselves (10-minute quarters, 5-minute OT).
+
+Call:
+    import updated_lineups as ul
+    from oncourt_intervals import OnCourtIndex
+
+    idx = OnCourtIndex(ul.load_game_recaps("Game Recaps"))
+    idx.at("241220", period=4, clock="3:12")
+    idx.overlapping("241220", start=idx.game_sec("241220", 4, "5:00"), end=idx.game_sec("241220", 4, "2:00"))
+    idx.join_events(events_df)     # events_df: game, period, clock  (or game, game_sec)
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import updated_lineups as ul
+
+KEEP_COLS = ["game", "teamId", "periodNumber", "sStart", "sEnd", "secs", "lineup"] + ul.PID_COLS
+
+
+def clock_to_secs(clock: Union[str, float, int]) -> float:
+    """'3:12' -> 192.0; numbers pass through as seconds."""
+    if isinstance(clock, str):
+        mins, _, secs = clock.strip().partition(":")
+        return float(mins) * 60 + float(secs or 0)
+    return float(clock)
+
+
+class OnCourtIndex:
+    """
+    Sorted-endpoint interval index of stints, one block per (game, teamId).
+
+    All blocks share one global axis: global_t = block_code * span + game_sec, where span is
+    larger than any game's length, so one searchsorted covers every game at once.
+    """
+
+    def __init__(self, raw: pd.DataFrame):
+        df = raw.copy()
+        if "lineup" not in df.columns:
+            df = ul.add_lineup_codes(df)
+        if "teamId" not in df.columns:
+            df["teamId"] = 0
+        df["game"] = df["game"].astype(str).str.lower()
+        df = df[[c for c in KEEP_COLS if c in df.columns]]
+        # zero-length stints (two subs at one stoppage) never hold the floor
+        df = df[df["sEnd"] > df["sStart"]]
+
+        df = df.sort_values(["game", "teamId", "sStart", "sEnd"], kind="mergesort").reset_index(drop=True)
+        block_keys = pd.MultiIndex.from_frame(df[["game", "teamId"]])
+        codes, uniques = pd.factorize(block_keys)
+
+        self.span = float(np.ceil(df["sEnd"].max()) + 1) if len(df) else 1.0
+        self.blocks = pd.Series(np.arange(len(uniques)), index=uniques)
+        self.df = df
+        self._block = codes
+        self._starts = codes * self.span + df["sStart"].to_numpy(dtype=float)
+        self._ends = codes * self.span + df["sEnd"].to_numpy(dtype=float)
+        self._last = np.r_[codes[1:] != codes[:-1], True] if len(codes) else np.zeros(0, dtype=bool)
+        self._teams_by_game = df.groupby("game")["teamId"].unique()
+
+        self.periods = (
+            df.groupby(["game", "teamId", "periodNumber"])
+            .agg(period_start=("sStart", "min"), period_end=("sEnd", "max"))
+            .reset_index()
+        )
+
+    # ---- time helpers ----
+    def _team(self, game: str, team_id: Optional[int]) -> int:
+        if team_id is not None:
+            return team_id
+        teams = self._teams_by_game.get(str(game).lower(), [])
+        if len(teams) != 1:
+            raise ValueError(f"Game {game!r} has {len(teams)} teams indexed; pass team_id.")
+        return teams[0]
+
+    def _block_code(self, game: str, team_id: Optional[int]) -> int:
+        game = str(game).lower()
+        return int(self.blocks.loc[(game, self._team(game, team_id))])
+
+    def game_sec(self, game: str, period: int, clock: Union[str, float], team_id: Optional[int] = None) -> float:
+        """Game seconds elapsed at `clock` remaining in `period`."""
+        game = str(game).lower()
+        team = self._team(game, team_id)
+        p = self.periods
+        row = p[(p["game"] == game) & (p["teamId"] == team) & (p["periodNumber"] == period)]
+        if row.empty:
+            raise KeyError(f"No stints for game {game!r}, period {period}.")
+        return float(row["period_end"].iloc[0] - clock_to_secs(clock))
+
+    # ---- queries ----
+    def _locate(self, g: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Row position of the stint covering each global time (and whether it really covers it)."""
+        i = np.searchsorted(self._starts, g, side="right") - 1
+        i_safe = np.clip(i, 0, max(len(self._starts) - 1, 0))
+        ends = self._ends[i_safe]
+        # intervals are [start, end); the final buzzer still belongs to the last stint of a block
+        covers = (g < ends) | ((g == ends) & self._last[i_safe])
+        hit = (i >= 0) & (self._block[i_safe] == codes) & covers
+        return i_safe, hit
+
+    def at(
+        self,
+        game: str,
+        t: Optional[float] = None,
+        period: Optional[int] = None,
+        clock: Optional[Union[str, float]] = None,
+        team_id: Optional[int] = None,
+    ) -> Optional[pd.Series]:
+        """The stint on the floor at game second t (or at period + clock). None if no stint covers t."""
+        if t is None:
+            if period is None or clock is None:
+                raise ValueError("Pass either t (game seconds) or period + clock.")
+            t = self.game_sec(game, period, clock, team_id)
+        code = self._block_code(game, team_id)
+        i, hit = self._locate(np.array([code * self.span + float(t)]), np.array([code]))
+        return self.df.iloc[int(i[0])] if hit[0] else None
+
+    def overlapping(self, game: str, start: float, end: float, team_id: Optional[int] = None) -> pd.DataFrame:
+        """Stints overlapping [start, end) game seconds, with the overlap length in `overlap_secs`."""
+        code = self._block_code(game, team_id)
+        g0, g1 = code * self.span + float(start), code * self.span + float(end)
+        lo = int(np.searchsorted(self._ends, g0, side="right"))
+        hi = int(np.searchsorted(self._starts, g1, side="left"))
+        out = self.df.iloc[lo:hi].copy()
+        out["overlap_secs"] = np.minimum(out["sEnd"], end) - np.maximum(out["sStart"], start)
+        return out[out["overlap_secs"] > 0]
+
+    def join_events(self, events: pd.DataFrame, team_id: Optional[int] = None) -> pd.DataFrame:
+        """
+        Attach the on-floor lineup to every event row in one vectorized pass.
+
+        events needs `game` plus either `game_sec` or `period` + `clock`; an optional `teamId`
+        column (or team_id) picks the team when a game has both teams indexed.
+        Unmatched events get NaN lineup columns.
+        """
+        ev = events.copy()
+        game = ev["game"].astype(str).str.lower()
+        if "teamId" in ev.columns:
+            team = ev["teamId"].to_numpy()
+        elif team_id is not None:
+            team = np.full(len(ev), team_id)
+        else:
+            n_teams = self._teams_by_game.map(len)
+            ambiguous = set(game) & set(n_teams.index[n_teams > 1])
+            if ambiguous:
+                raise ValueError(f"Games {sorted(ambiguous)} have both teams indexed; pass teamId or team_id.")
+            # unknown games map to NaN and simply go unmatched
+            team = game.map(self._teams_by_game.map(lambda a: a[0])).to_numpy()
+
+        codes = self.blocks.reindex(pd.MultiIndex.from_arrays([game, team])).to_numpy()
+        if "game_sec" in ev.columns:
+            t = ev["game_sec"].to_numpy(dtype=float)
+        else:
+            p = self.periods.set_index(["game", "teamId", "periodNumber"])["period_end"]
+            period_end = p.reindex(pd.MultiIndex.from_arrays([game, team, ev["period"]])).to_numpy(dtype=float)
+            t = period_end - ev["clock"].map(clock_to_secs).to_numpy(dtype=float)
+        ev["game_sec"] = t
+
+        ok = ~np.isnan(codes) & ~np.isnan(t)
+        codes = np.where(ok, codes, -1).astype(np.int64)
+        g = np.where(ok, codes * self.span + np.nan_to_num(t), -1.0)
+        i_safe, hit = self._locate(g, codes)
+        hit &= ok
+
+        matched = self.df.iloc[i_safe].reset_index(drop=True)
+        matched = matched.drop(columns=["game", "teamId"]).where(pd.Series(hit), other=np.nan)
+        return pd.concat([ev.reset_index(drop=True), matched], axis=1)
+
+
+if __name__ == "__main__":
+    idx = OnCourtIndex(ul.load_game_recaps("Game Recaps"))
+    print(idx.at("241220", period=4, clock="3:12"))
+    t0, t1 = idx.game_sec("241220", 4, "5:00"), idx.game_sec("241220", 4, "2:00")
+    print(idx.overlapping("241220", t0, t1)[["lineup", "sStart", "sEnd", "overlap_secs"]])
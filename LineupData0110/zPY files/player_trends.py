@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+player_trends.py
+
+Game-by-game player impact from RAW stint-level lineup data:
+minutes, on-court plus-minus and on-court net rating per game, plus EWMA and rolling trends.
+
+- every pId is encoded once to a column of a game x player matrix; each stint's base stats
+  (secs, pts for / against, netPts, o / d possessions) are scatter-added to its five players
+  with np.add.at
+- rates are always re-derived from (smoothed) sums, so a 2-possession game doesn't swing the
+  EWMA net rating as hard as a 70-possession one
+- EWMA state is carried per player, so add_game folds one new game in O(players) without
+  touching earlier games; rolling windows come from cumulative sums along the game axis
+
+Call:
+    import updated_lineups as ul
+    from player_trends import PlayerGameSeries
+
+    series = PlayerGameSeries(ul.load_game_recaps("Game Recaps"), span=5, window=3)
+    series.trends()                         # long table: game, player, per-game + ewm_ + roll_ columns
+    series.add_game(pd.read_csv("Game Recaps/250111.csv", dtype={c: "string" for c in ul.PID_COLS}), "250111")
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import updated_lineups as ul
+
+# base stat -> raw stint column
+BASE_STATS = {
+    "secs": "secs",
+    "pts_for": "ptsScored",
+    "pts_against": "ptsAgst",
+    "plus_minus": "netPts",
+    "o_poss": "oPoss",
+    "d_poss": "dPoss",
+}
+DATE_RE = re.compile(r"(\d{6})")  # YYMMDD, same convention as progressionbuilder
+
+
+def _game_sort_key(game: str):
+    m = DATE_RE.search(os.path.basename(str(game)))
+    return (m.group(1) if m else "", str(game))
+
+
+def _net_rtg(s: np.ndarray) -> np.ndarray:
+    """On-court net rating from a stack of base sums (axis 0 ordered like BASE_STATS)."""
+    names = list(BASE_STATS)
+    pf, pa = s[names.index("pts_for")], s[names.index("pts_against")]
+    op, dp = s[names.index("o_poss")], s[names.index("d_poss")]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        off = np.where(op > 0, pf / op, np.nan)
+        dfn = np.where(dp > 0, pa / dp, np.nan)
+    return (off - dfn) * 100
+
+
+class PlayerGameSeries:
+    """
+    Game x player matrices of on-court base stats with incremental EWMA state.
+
+    span: EWMA span in games (alpha = 2 / (span + 1)); each player's EWMA starts at their first game.
+    window: rolling window length in games.
+    team_id: optional teamId filter for files that contain both teams.
+    """
+
+    def __init__(self, raw: Optional[pd.DataFrame] = None, span: int = 5, window: int = 3, team_id: Optional[int] = None):
+        self.span = span
+        self.window = window
+        self.team_id = team_id
+        self.alpha = 2.0 / (span + 1.0)
+
+        self.games: List[str] = []
+        self.players: List[str] = []  # pIds, column order of the matrices
+        self.labels: Dict[str, str] = {}  # pId -> initials
+        self._col: Dict[str, int] = {}
+
+        n = len(BASE_STATS)
+        self._sums = np.zeros((n, 8, 16))  # (stat, game, player), grown by doubling
+        self._ewm = np.zeros((n, 8, 16))
+        self._first = np.full(16, -1, dtype=np.int64)  # first game index per player
+
+        if raw is not None and not raw.empty:
+            for game in sorted(raw["game"].astype(str).unique(), key=_game_sort_key):
+                self.add_game(raw[raw["game"].astype(str) == game], game)
+
+    # ---- storage ----
+    def _reserve(self, n_games: int, n_players: int) -> None:
+        _, g_cap, p_cap = self._sums.shape
+        if n_games <= g_cap and n_players <= p_cap:
+            return
+        g_new, p_new = max(g_cap, 1), max(p_cap, 1)
+        while g_new < n_games:
+            g_new *= 2
+        while p_new < n_players:
+            p_new *= 2
+        for name in ("_sums", "_ewm"):
+            old = getattr(self, name)
+            grown = np.zeros((old.shape[0], g_new, p_new))
+            grown[:, :g_cap, :p_cap] = old
+            setattr(self, name, grown)
+        first = np.full(p_new, -1, dtype=np.int64)
+        first[:p_cap] = self._first
+        self._first = first
+
+    def _encode(self, stints: pd.DataFrame) -> np.ndarray:
+        """(n_stints, 5) player column indices, registering unseen pIds; -1 for an empty pId slot."""
+        pids = stints[ul.PID_COLS].astype("string").fillna("").apply(lambda c: c.str.strip()).to_numpy(dtype=str)
+        uniq, inv = np.unique(pids, return_inverse=True)
+        cols = np.empty(len(uniq), dtype=np.int64)
+        names = {}
+        for i in range(1, 6):
+            names.update(zip(pids[:, i - 1], stints.get(f"pName{i}", pd.Series("", index=stints.index)).fillna("")))
+        for j, pid in enumerate(uniq):
+            if pid == "":
+                cols[j] = -1
+                continue
+            if pid not in self._col:
+                self._col[pid] = len(self.players)
+                self.players.append(pid)
+                self.labels[pid] = ul.player_initial(pid, names.get(pid, ""))
+            cols[j] = self._col[pid]
+        return cols[inv.reshape(pids.shape)]
+
+    # ---- ingest ----
+    def add_game(self, stints: pd.DataFrame, game: Optional[str] = None) -> None:
+        """
+        Fold one game's stints into the matrices and advance every player's EWMA by one game.
+        Games are appended in call order, so add them chronologically.
+        """
+        if game is None:
+            game = str(stints["game"].iloc[0])
+        game = str(game).lower()
+        if game in self.games:
+            raise ValueError(f"Game {game!r} already added.")
+        if self.team_id is not None and "teamId" in stints.columns:
+            stints = stints[stints["teamId"] == self.team_id]
+
+        cols = self._encode(stints)
+        g = len(self.games)
+        self._reserve(g + 1, len(self.players))
+        self.games.append(game)
+
+        vals = stints[list(BASE_STATS.values())].to_numpy(dtype=float)  # (n_stints, n_stats)
+        row = np.zeros((len(BASE_STATS), self._sums.shape[2]))
+        # each stint's stats go to all five of its players (empty pId slots skipped)
+        flat = cols.ravel()
+        filled = flat >= 0
+        np.add.at(row.T, flat[filled], np.repeat(vals, 5, axis=0)[filled])
+        self._sums[:, g] = row
+
+        played = np.zeros(self._sums.shape[2], dtype=bool)
+        played[np.unique(flat[filled])] = True
+        debut = played & (self._first < 0)
+        self._first[debut] = g
+
+        prev = self._ewm[:, g - 1] if g > 0 else np.zeros_like(row)
+        ewm = self.alpha * row + (1 - self.alpha) * prev
+        ewm[:, debut] = row[:, debut]
+        self._ewm[:, g] = ewm
+
+    # ---- outputs ----
+    def matrix(self, stat: str = "minutes") -> pd.DataFrame:
+        """Game x player table for a base stat, `minutes` or `net_rtg` (columns are initials)."""
+        s = self._sums[:, : len(self.games), : len(self.players)]
+        if stat == "minutes":
+            vals = s[list(BASE_STATS).index("secs")] / 60
+        elif stat == "net_rtg":
+            vals = _net_rtg(s)
+        else:
+            vals = s[list(BASE_STATS).index(stat)]
+        return pd.DataFrame(vals, index=pd.Index(self.games, name="game"), columns=[self.labels[p] for p in self.players])
+
+    def trends(self) -> pd.DataFrame:
+        """
+        Long table, one row per (game, player) from each player's first game on:
+        minutes / plus_minus / net_rtg for the game, their EWMA (ewm_*) and rolling-window (roll_*) values.
+        Rolling rates are computed from rolling sums; rolling minutes / plus_minus are per-game averages
+        over the games in the window since the player's first game (like the EWMA, no pre-debut zeros).
+        """
+        n_g, n_p = len(self.games), len(self.players)
+        s = self._sums[:, :n_g, :n_p]
+        e = self._ewm[:, :n_g, :n_p]
+
+        csum = np.concatenate([np.zeros((s.shape[0], 1, n_p)), np.cumsum(s, axis=1)], axis=1)
+        lo = np.maximum(np.arange(1, n_g + 1) - self.window, 0)
+        roll = csum[:, 1:] - csum[:, lo]
+        # games in each player's window, counted from their first game
+        first = self._first[:n_p]
+        n_in = np.maximum(np.arange(1, n_g + 1)[:, None] - np.maximum(lo[:, None], first[None, :]), 1)
+
+        secs, pm = list(BASE_STATS).index("secs"), list(BASE_STATS).index("plus_minus")
+        out = {
+            "minutes": s[secs] / 60,
+            "plus_minus": s[pm],
+            "net_rtg": _net_rtg(s),
+            "ewm_minutes": e[secs] / 60,
+            "ewm_plus_minus": e[pm],
+            "ewm_net_rtg": _net_rtg(e),
+            "roll_minutes": roll[secs] / 60 / n_in,
+            "roll_plus_minus": roll[pm] / n_in,
+            "roll_net_rtg": _net_rtg(roll),
+        }
+
+        g_idx, p_idx = np.meshgrid(np.arange(n_g), np.arange(n_p), indexing="ij")
+        active = (self._first[:n_p] >= 0)[None, :] & (g_idx >= self._first[:n_p][None, :])
+        table = pd.DataFrame(
+            {
+                "game": np.array(self.games, dtype=object)[g_idx[active]],
+                "player": np.array([self.labels[p] for p in self.players], dtype=object)[p_idx[active]],
+                "pId": np.array(self.players, dtype=object)[p_idx[active]],
+                **{k: v[active] for k, v in out.items()},
+            }
+        )
+        return table
+
+
+if __name__ == "__main__":
+    series = PlayerGameSeries(ul.load_game_recaps("Game Recaps"), span=3, window=3)
+    print(series.matrix("minutes").round(1))
+    print(series.trends().tail(12).round(2))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+progression_diff.py
+
+Interval-to-interval delta report for build_progression_csv output.
+
+Lineups are factorized to integer codes and the progression is laid out as one dense
+(interval, lineup, metric) array, so every metric's change between consecutive intervals
+is a single array subtraction. Rating changes get a z-score from the possessions behind
+both intervals (per-possession scoring SD `ppp_sd`, ~1 point for college basketball):
+    var(rating per 100) = (100 * ppp_sd)^2 / possessions
+and are flagged when |z| >= z_crit.
+
+Call:
+    from progressionbuilder import build_progression_csv
+    from progression_diff import progression_deltas
+
+    prog = build_progression_csv("Game Recaps", "*.csv", "3,2,2", output_path=None)
+    deltas = progression_deltas(prog)
+    deltas[deltas["sig_net_rtg"]]
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DELTA_METRICS = [
+    "minutes", "PM_p40", "rel_PM_p40", "net_rtg", "off_rtg", "def_rtg",
+    "rel_net_rtg", "rel_off_rtg", "rel_def_rtg",
+    "o_eFG%", "d_eFG%", "o_TOV%", "d_TOV%", "o_orbR", "d_orbR", "o_ftaR", "d_ftaR",
+]
+
+# rating metric -> possession columns its noise comes from
+RATING_POSS: Dict[str, Tuple[str, ...]] = {
+    "off_rtg": ("o_poss",),
+    "def_rtg": ("d_poss",),
+    "net_rtg": ("o_poss", "d_poss"),
+    "rel_off_rtg": ("o_poss",),
+    "rel_def_rtg": ("d_poss",),
+    "rel_net_rtg": ("o_poss", "d_poss"),
+}
+
+
+def _rating_var(poss: Dict[str, np.ndarray], cols: Tuple[str, ...], ppp_sd: float) -> np.ndarray:
+    """Sampling variance of a per-100 rating given its possession counts (inf when no possessions)."""
+    with np.errstate(divide="ignore"):
+        return sum((100 * ppp_sd) ** 2 / np.where(poss[c] > 0, poss[c], 0.0) for c in cols)
+
+
+def progression_deltas(
+    prog: pd.DataFrame,
+    metrics: Sequence[str] = DELTA_METRICS,
+    min_minutes: float = 0.0,
+    ppp_sd: float = 1.0,
+    z_crit: float = 1.96,
+    include_missing: bool = False,
+) -> pd.DataFrame:
+    """
+    One row per (lineup, consecutive interval pair) with d_<metric> deltas plus, for rating
+    metrics, z_<metric> and sig_<metric>.
+
+    min_minutes: a lineup must play at least this many minutes in both intervals.
+    include_missing: also keep pairs where the lineup only appears in one of the two intervals
+      (deltas NaN) to see lineups entering / leaving the rotation.
+    """
+    metrics = [m for m in metrics if m in prog.columns]
+    intervals = np.sort(prog["interval_num"].unique())
+    if len(intervals) < 2:
+        return pd.DataFrame()
+
+    codes, lineups = pd.factorize(prog["lineup"].astype(str))
+    t = np.searchsorted(intervals, prog["interval_num"].to_numpy())
+    n_t, n_l = len(intervals), len(lineups)
+
+    def dense(cols: Sequence[str]) -> np.ndarray:
+        arr = np.full((n_t, n_l, len(cols)), np.nan)
+        arr[t, codes] = prog[list(cols)].to_numpy(dtype=float)
+        return arr
+
+    vals = dense(metrics)
+    poss_cols = ["minutes", "o_poss", "d_poss"]
+    base = dense(poss_cols)
+    delta = vals[1:] - vals[:-1]  # (n_t - 1, n_l, n_metrics)
+
+    a, b = base[:-1], base[1:]
+    present_a, present_b = ~np.isnan(a[..., 0]), ~np.isnan(b[..., 0])
+    both = present_a & present_b & (np.nan_to_num(a[..., 0]) >= min_minutes) & (np.nan_to_num(b[..., 0]) >= min_minutes)
+    keep = (present_a | present_b) if include_missing else both
+    ti, li = np.nonzero(keep)
+
+    out = pd.DataFrame(
+        {
+            "lineup": lineups[li],
+            "from_interval": intervals[ti],
+            "to_interval": intervals[ti + 1],
+            "minutes_from": a[ti, li, 0],
+            "minutes_to": b[ti, li, 0],
+            "poss_from": a[ti, li, 1] + a[ti, li, 2],
+            "poss_to": b[ti, li, 1] + b[ti, li, 2],
+        }
+    )
+    for j, m in enumerate(metrics):
+        out[f"d_{m}"] = delta[ti, li, j]
+
+    pa = {c: np.nan_to_num(a[ti, li, k]) for k, c in enumerate(poss_cols)}
+    pb = {c: np.nan_to_num(b[ti, li, k]) for k, c in enumerate(poss_cols)}
+    for m, cols in RATING_POSS.items():
+        if m not in metrics:
+            continue
+        se = np.sqrt(_rating_var(pa, cols, ppp_sd) + _rating_var(pb, cols, ppp_sd))
+        with np.errstate(invalid="ignore"):
+            z = out[f"d_{m}"].to_numpy() / se
+        out[f"z_{m}"] = z
+        out[f"sig_{m}"] = np.abs(np.nan_to_num(z)) >= z_crit
+
+    return out.sort_values(["from_interval", "minutes_to"], ascending=[True, False], kind="mergesort").reset_index(drop=True)
+
+
+def summarize_deltas(deltas: pd.DataFrame, metric: str = "net_rtg") -> pd.DataFrame:
+    """Significant risers / fallers on one rating metric, largest |z| first."""
+    sig = deltas[deltas[f"sig_{metric}"]].copy()
+    sig["direction"] = np.where(sig[f"d_{metric}"] > 0, "improved", "regressed")
+    if metric in ("def_rtg", "rel_def_rtg"):
+        sig["direction"] = np.where(sig[f"d_{metric}"] < 0, "improved", "regressed")
+    cols = ["lineup", "from_interval", "to_interval", "poss_from", "poss_to", f"d_{metric}", f"z_{metric}", "direction"]
+    return sig.reindex(sig[f"z_{metric}"].abs().sort_values(ascending=False).index)[cols].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import progressionbuilder as pb
+
+    prog = pb.build_progression_csv("Game Recaps", "*.csv", "3,2,2", output_path=None)
+    deltas = progression_deltas(prog, min_minutes=4)
+    print(deltas[["lineup", "from_interval", "to_interval", "d_net_rtg", "z_net_rtg", "sig_net_rtg"]].round(2))
+    print(summarize_deltas(deltas).round(2))
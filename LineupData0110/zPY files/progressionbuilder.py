@@ -42,6 +42,9 @@ except Exception as e:
         f"{e}"
     )
 
+from columnar_io import write_table
+from stint_dedup import StintDedupIndex, is_copy_name
+
 DATE_RE = re.compile(r"(\d{6})")  # YYMMDD
 
 
@@ -63,7 +66,7 @@ def _discover_files(input_dir: str, pattern: str) -> List[FileInfo]:
         yymmdd = _extract_yymmdd(p)
         if yymmdd:
             infos.append(FileInfo(path=p, yymmdd=yymmdd))
-    infos.sort(key=lambda x: x.yymmdd)
+    infos.sort(key=lambda x: (x.yymmdd, is_copy_name(x.path), x.path))  # originals before copies
     return infos
 
 
@@ -120,10 +123,11 @@ desired = [
         "rel_off_rtg", "rel_def_rtg",
     ]
 
-def lineup_summary_from_raw(raw: pd.DataFrame) -> pd.DataFrame:
+def lineup_summary_from_raw(raw: pd.DataFrame, decimals: Optional[int] = 3) -> pd.DataFrame:
     """
     Interval-level lineup summary from RAW stint-level rows.
     Mirrors the structure of updated_lineups.process_lineups aggregation.
+    decimals: rounding for numeric columns; None keeps full precision.
     """
     _require_cols(raw, ["secs", "ptsScored", "ptsAgst", "netPts", "oPoss", "dPoss"], "raw data")
 
@@ -217,8 +221,9 @@ def lineup_summary_from_raw(raw: pd.DataFrame) -> pd.DataFrame:
     agg["team_PM_p40"] = team_PM_p40
 
     # Round + sort
-    numeric_cols = agg.select_dtypes(include=["float64", "int64", "float32", "int32"]).columns
-    agg[numeric_cols] = agg[numeric_cols].round(3)
+    if decimals is not None:
+        numeric_cols = agg.select_dtypes(include=["float64", "int64", "float32", "int32"]).columns
+        agg[numeric_cols] = agg[numeric_cols].round(decimals)
     agg = agg.sort_values(by="minutes", ascending=False).reset_index(drop=True)
 
     return agg
@@ -228,15 +233,24 @@ def build_progression_csv(
     input_dir: str,
     pattern: str,
     intervals_str: str = "3,2,3",
-    output_path: str = "progression.csv",
+    output_path: Optional[str] = "progression.csv",
     team_id: Optional[int] = None,
+    dedupe: bool = True,
+    fmt: Optional[str] = "parquet",
 ) -> pd.DataFrame:
     """
     Build progression.csv from raw game recap files.
 
+    output_path:
+      None builds the table in memory only.
     team_id:
       If your raw files contain multiple teams, pass the LMU teamId.
       If None, no filter is applied.
+    dedupe:
+      Skip byte-identical files and stint rows whose `_id` was already read (see stint_dedup.py).
+    fmt:
+      Columnar copy written next to output_path ("parquet", "feather" or None), see columnar_io.py.
+      The CSV is rounded to 3 decimals; the returned DataFrame and columnar copy are unrounded.
     """
     intervals = _parse_intervals(intervals_str)
     files = _discover_files(input_dir, pattern)
@@ -245,35 +259,46 @@ def build_progression_csv(
 
     chunks = _chunk_files(files, intervals)
     out_frames: List[pd.DataFrame] = []
+    index = StintDedupIndex() if dedupe else None
 
     for interval_num, group in enumerate(chunks, start=1):
         dfs: List[pd.DataFrame] = []
         for fi in group:
+            if index is not None and index.seen_file(fi.path):
+                continue
             df = pd.read_csv(fi.path)
+            if index is not None:
+                df = index.filter_rows(df, source=fi.path)
             df["game_yymmdd"] = fi.yymmdd
             dfs.append(df)
 
+        if not dfs:
+            continue
         raw = pd.concat(dfs, ignore_index=True)
 
         if team_id is not None and "teamId" in raw.columns:
             raw = raw[raw["teamId"] == team_id].copy()
 
         # Build interval lineup summary with true underlying math
-        interval_summary = lineup_summary_from_raw(raw)
+        interval_summary = lineup_summary_from_raw(raw, decimals=None)
 
         # Add interval metadata
         games = [fi.yymmdd for fi in group]
         interval_summary["interval_num"] = interval_num
         interval_summary["interval_start"] = games[0]
         interval_summary["interval_end"] = games[-1]
-        interval_summary["interval_len"] = len(group)  
+        interval_summary["interval_len"] = len(dfs)  # files actually read (skipped duplicates excluded)
 
         interval_summary = interval_summary[desired]
 
         out_frames.append(interval_summary)
 
+    if index is not None and not index.report().empty:
+        print(f"Skipped duplicate stints:\n{index.report().to_string(index=False)}")
+
     progression = pd.concat(out_frames, ignore_index=True)
-    progression.to_csv(output_path, index=False)
+    if output_path is not None:
+        write_table(progression, output_path, round_csv=3, fmt=fmt)
     return progression
 
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+rotation_optimizer.py
+
+"Best available five" under injuries / foul trouble.
+
+1) fit_lineup_model: additive player + pair model fitted on the lineup summary
+       rating(lineup) ~ intercept + sum(player effects) + sum(pair effects over its 10 pairs)
+   as possession-weighted ridge regression (pairs are shrunk harder than players, so
+   thin pair evidence falls back to the individual effects).
+2) best_lineups: branch-and-bound over the available roster using the precomputed
+   player vector + pair matrix. Partial fives are pruned when an upper bound on the
+   best completion can't beat the current k-th best, or when a constraint can no longer
+   be met (max bigs, required ball-handler, required players, minutes caps).
+
+Call:
+    from columnar_io import read_table
+    from rotation_optimizer import fit_lineup_model, best_lineups
+
+    model = fit_lineup_model(read_table("Lineup Data/lineup_summary_all_games.csv", round=None))
+    best_lineups(model, unavailable=["CH"], max_bigs=1, ball_handlers=["JL", "AM"], top_k=5)
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from updated_combos import PLAYER_INFO, sort_players_by_height
+
+BIG_HEIGHT = 74  # inches; players at or above count as bigs unless `bigs` is passed
+
+
+@dataclass(frozen=True)
+class LineupModel:
+    players: List[str]
+    intercept: float
+    player_effects: np.ndarray  # (P,)
+    pair_effects: np.ndarray  # (P, P), symmetric, zero diagonal
+    target: str
+    observed: pd.DataFrame  # lineup table the model was fitted on (lineup, minutes, poss_total, target)
+
+    def score(self, lineup: Sequence[str]) -> float:
+        idx = [self.players.index(p) for p in lineup]
+        pairs = sum(self.pair_effects[i, j] for i, j in combinations(idx, 2))
+        return float(self.intercept + self.player_effects[idx].sum() + pairs)
+
+
+def fit_lineup_model(
+    lineups: pd.DataFrame,
+    target: str = "net_rtg",
+    weight: str = "poss_total",
+    player_ridge: float = 100.0,
+    pair_ridge: float = 400.0,
+) -> LineupModel:
+    """
+    Possession-weighted ridge fit of the additive player + pair model.
+
+    lineups: a lineup summary (updated_lineups.process_lineups / lineup_summary_all_games).
+    player_ridge / pair_ridge: L2 penalties, in possessions of pseudo-evidence.
+    """
+    lineups = lineups[lineups[weight] > 0]
+    members = lineups["lineup"].astype(str).str.split("-", expand=True).to_numpy(dtype=object)
+    if members.shape[1] != 5:
+        raise ValueError("Every lineup must have exactly 5 players.")
+
+    players = sorted(set(members.ravel()))
+    pos = {p: i for i, p in enumerate(players)}
+    idx = np.vectorize(pos.__getitem__, otypes=[np.int64])(members)
+    n, n_players = len(lineups), len(players)
+
+    pair_i, pair_j = np.triu_indices(n_players, k=1)
+    pair_col = np.full((n_players, n_players), -1, dtype=np.int64)
+    pair_col[pair_i, pair_j] = np.arange(len(pair_i))
+    pair_col[pair_j, pair_i] = pair_col[pair_i, pair_j]
+
+    # design: [intercept | players | pairs]
+    X = np.zeros((n, 1 + n_players + len(pair_i)))
+    X[:, 0] = 1.0
+    rows = np.arange(n)[:, None]
+    X[rows, 1 + idx] = 1.0
+    slot_a, slot_b = np.triu_indices(5, k=1)
+    X[rows, 1 + n_players + pair_col[idx[:, slot_a], idx[:, slot_b]]] = 1.0
+
+    w = lineups[weight].to_numpy(dtype=float)
+    y = lineups[target].to_numpy(dtype=float)
+    penalty = np.r_[0.0, np.full(n_players, player_ridge), np.full(len(pair_i), pair_ridge)]
+
+    XtW = X.T * w
+    beta = np.linalg.solve(XtW @ X + np.diag(penalty), XtW @ y)
+
+    pair_effects = np.zeros((n_players, n_players))
+    pair_effects[pair_i, pair_j] = beta[1 + n_players:]
+    pair_effects[pair_j, pair_i] = pair_effects[pair_i, pair_j]
+
+    observed = lineups[["lineup", "minutes", weight, target]].reset_index(drop=True)
+    return LineupModel(players, float(beta[0]), beta[1:1 + n_players], pair_effects, target, observed)
+
+
+def best_lineups(
+    model: LineupModel,
+    available: Optional[Iterable[str]] = None,
+    unavailable: Iterable[str] = (),
+    required: Iterable[str] = (),
+    max_bigs: Optional[int] = None,
+    bigs: Optional[Iterable[str]] = None,
+    ball_handlers: Optional[Iterable[str]] = None,
+    minutes_left: Optional[Dict[str, float]] = None,
+    stint_minutes: float = 0.0,
+    top_k: int = 5,
+) -> pd.DataFrame:
+    """
+    Top-k fives by model score under constraints.
+
+    available / unavailable: roster pool (defaults to every player in the model).
+    required: players that must be on the floor.
+    max_bigs: cap on bigs (height >= BIG_HEIGHT from PLAYER_INFO, or the `bigs` list).
+    ball_handlers: at least one of these must be on the floor.
+    minutes_left + stint_minutes: players whose remaining minutes cap is below the planned
+      stint length are dropped from the pool.
+    """
+    pool = list(available) if available is not None else list(model.players)
+    out_set = set(unavailable)
+    if minutes_left:
+        out_set |= {p for p, m in minutes_left.items() if m < stint_minutes}
+    pool = [p for p in pool if p in model.players and p not in out_set]
+
+    required = [p for p in required]
+    missing = [p for p in required if p not in pool]
+    if missing:
+        raise ValueError(f"Required players not available: {missing}")
+    if len(pool) < 5:
+        raise ValueError(f"Only {len(pool)} players available; need 5.")
+
+    if bigs is None:
+        bigs = {p for p in pool if PLAYER_INFO.get(p, {}).get("height", 0) >= BIG_HEIGHT}
+    big_flag = np.array([p in set(bigs) for p in pool])
+    handler_flag = np.array([p in set(ball_handlers) for p in pool]) if ball_handlers is not None else None
+
+    gi = np.array([model.players.index(p) for p in pool])
+    player_eff = model.player_effects[gi]
+    pair_eff = model.pair_effects[np.ix_(gi, gi)]
+    pos_pair = np.maximum(pair_eff, 0.0)
+
+    # required players are fixed first; the rest are searched best-first by a standalone bound
+    req_idx = [pool.index(p) for p in required]
+    free = [i for i in range(len(pool)) if i not in req_idx]
+    standalone = player_eff + np.sort(pos_pair, axis=1)[:, ::-1][:, :4].sum(axis=1) * 0.5
+    free.sort(key=lambda i: -standalone[i])
+
+    heap: List[tuple] = []  # (score, lineup tuple) min-heap of the current top-k
+
+    def bound(chosen: List[int], cands: List[int], k: int) -> float:
+        # sum of the k best per-candidate upper bounds; pairs among future picks are split 50/50
+        c = np.array(cands)
+        gains = player_eff[c] + pair_eff[np.ix_(chosen, c)].sum(axis=0) if chosen else player_eff[c].copy()
+        if k > 1:
+            sub = pos_pair[np.ix_(c, c)]
+            gains = gains + 0.5 * np.sort(sub, axis=1)[:, ::-1][:, : k - 1].sum(axis=1)
+        return float(np.sort(gains)[::-1][:k].sum())
+
+    def feasible(chosen: List[int], cands: List[int], k: int) -> bool:
+        if max_bigs is not None and big_flag[chosen].sum() > max_bigs:
+            return False
+        if max_bigs is not None and k > 0 and (len(cands) - big_flag[cands].sum()) < k - max(0, max_bigs - big_flag[chosen].sum()):
+            return False
+        if handler_flag is not None and not handler_flag[chosen].any():
+            if k == 0 or not handler_flag[cands].any():
+                return False
+        return len(cands) >= k
+
+    def partial(chosen: List[int]) -> float:
+        s = player_eff[chosen].sum()
+        if len(chosen) > 1:
+            a, b = np.triu_indices(len(chosen), k=1)
+            s += pair_eff[np.array(chosen)[a], np.array(chosen)[b]].sum()
+        return float(s)
+
+    def search(chosen: List[int], start: int) -> None:
+        k = 5 - len(chosen)
+        cands = free[start:]
+        if not feasible(chosen, cands, k):
+            return
+        current = partial(chosen)
+        if k == 0:
+            item = (current, tuple(chosen))
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            return
+        if len(heap) == top_k and current + bound(chosen, cands, k) <= heap[0][0]:
+            return
+        for pos in range(start, len(free) - k + 1):
+            search(chosen + [free[pos]], pos + 1)
+
+    search(list(req_idx), 0)
+
+    observed = model.observed.set_index("lineup")
+    rows = []
+    for score, chosen in sorted(heap, reverse=True):
+        members = sort_players_by_height([pool[i] for i in chosen], PLAYER_INFO)
+        lineup = "-".join(members)
+        rows.append(
+            {
+                "lineup": lineup,
+                f"pred_{model.target}": score + model.intercept,
+                "n_bigs": int(big_flag[list(chosen)].sum()),
+                "obs_minutes": float(observed["minutes"].get(lineup, 0.0)),
+                f"obs_{model.target}": observed[model.target].get(lineup, np.nan),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from columnar_io import read_table
+
+    model = fit_lineup_model(read_table("Lineup Data/lineup_summary_all_games.csv", round=None))
+    print(best_lineups(model, top_k=5))
+    print(best_lineups(model, unavailable=["CH"], max_bigs=1, top_k=5))
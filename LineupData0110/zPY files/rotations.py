@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+rotations.py
+
+Rotation and substitution-pattern mining from RAW stint-level lineup data.
+
+Stint rows are ordered by flowStint / stint within each game and period. This module
+looks at how lineups follow each other:
+- lineup_transitions: lineup -> next lineup counts and probabilities
+- substitution_times: when each player checks in / out (per period)
+- stint_lengths: length of each uninterrupted lineup run + per-game distribution
+
+Everything works on the integer `lineup_code` / player codes with shift + groupby,
+never a Python loop over rows, so a whole league season runs in seconds.
+
+Call:
+    import updated_lineups as ul
+    from rotations import lineup_transitions, substitution_times, stint_lengths
+
+    raw = ul.load_game_recaps("Game Recaps")
+    trans = lineup_transitions(raw)
+    subs = substitution_times(raw)
+    runs, dist = stint_lengths(raw)
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import updated_lineups as ul
+
+ORDER_COLS = ["game", "periodNumber", "flowStint", "stint"]
+
+
+def _block_cols(df: pd.DataFrame) -> List[str]:
+    # A "block" is one uninterrupted sequence of stints: same game, same team, same period
+    cols = ["game", "periodNumber"]
+    if "teamId" in df.columns:
+        cols.insert(1, "teamId")
+    return cols
+
+
+def _ordered_stints(raw: pd.DataFrame) -> pd.DataFrame:
+    """Encode lineups and sort stints into on-floor order."""
+    order_cols = [c for c in ORDER_COLS if c in raw.columns]
+    if "game" not in raw.columns:
+        raise KeyError("Stint rows need a `game` column (see updated_lineups.load_game_recaps).")
+
+    df = raw.copy()
+    if "lineup_code" not in df.columns:
+        df = ul.add_lineup_codes(df)
+
+    sort_cols = order_cols if "teamId" not in df.columns else ["teamId"] + order_cols
+    df = df.sort_values(sort_cols, kind="mergesort").reset_index(drop=True)
+
+    block_cols = _block_cols(df)
+    df["block_id"] = df.groupby(block_cols, sort=False).ngroup().to_numpy()
+    return df
+
+
+def _new_run(df: pd.DataFrame) -> np.ndarray:
+    """True where a row starts a new lineup run (new block or lineup changed)."""
+    block = df["block_id"].to_numpy()
+    code = df["lineup_code"].to_numpy()
+    out = np.ones(len(df), dtype=bool)
+    out[1:] = (block[1:] != block[:-1]) | (code[1:] != code[:-1])
+    return out
+
+
+def lineup_transitions(
+    raw: pd.DataFrame,
+    include_self: bool = False,
+    min_count: int = 1,
+) -> pd.DataFrame:
+    """
+    Lineup-to-lineup transition table (long form: one row per observed from -> to pair).
+
+    include_self:
+      Count consecutive rows with the same lineup (stint split by a stoppage) as a transition.
+    Returns columns: from_lineup, to_lineup, count, prob (row-normalized over from_lineup).
+    """
+    df = _ordered_stints(raw)
+    if df.empty:
+        return pd.DataFrame(columns=["from_lineup", "to_lineup", "count", "prob"])
+
+    block = df["block_id"].to_numpy()
+    code = df["lineup_code"].to_numpy().astype(np.int64)
+
+    valid = block[:-1] == block[1:]
+    if not include_self:
+        valid &= code[:-1] != code[1:]
+
+    src = code[:-1][valid]
+    dst = code[1:][valid]
+
+    n = int(code.max()) + 1
+    pair_key, counts = np.unique(src * n + dst, return_counts=True)
+    src_u, dst_u = pair_key // n, pair_key % n
+
+    labels = df.drop_duplicates("lineup_code").set_index("lineup_code")["lineup"]
+    out = pd.DataFrame(
+        {
+            "from_lineup": labels.reindex(src_u).to_numpy(),
+            "to_lineup": labels.reindex(dst_u).to_numpy(),
+            "count": counts,
+        }
+    )
+    out["prob"] = out["count"] / out.groupby("from_lineup")["count"].transform("sum")
+    out = out[out["count"] >= min_count]
+    return out.sort_values(["count", "prob"], ascending=[False, False]).reset_index(drop=True)
+
+
+def transition_matrix(transitions: pd.DataFrame, lineups: Optional[List[str]] = None, value: str = "prob") -> pd.DataFrame:
+    """
+    Dense from x to pivot of a lineup_transitions table (only sensible for one team's lineups).
+
+    lineups: optional list restricting / ordering both axes (e.g. top lineups by minutes).
+    """
+    piv = transitions.pivot(index="from_lineup", columns="to_lineup", values=value).fillna(0)
+    if lineups is not None:
+        piv = piv.reindex(index=lineups, columns=lineups, fill_value=0)
+    return piv
+
+
+def _player_long(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per (stint, player on court), with integer player codes."""
+    n = len(df)
+    pids = df[ul.PID_COLS].astype("string").fillna("").to_numpy(dtype=str)
+    name_cols = [f"pName{i}" for i in range(1, 6)]
+    names = (
+        df[name_cols].astype("string").fillna("").to_numpy(dtype=str)
+        if all(c in df.columns for c in name_cols)
+        else np.full_like(pids, "")
+    )
+
+    long = pd.DataFrame(
+        {
+            "row": np.repeat(np.arange(n), 5),
+            "pid": np.char.strip(pids.ravel()),
+            "pname": names.ravel(),
+        }
+    )
+    long = long[long["pid"] != ""]
+    long["player_code"] = pd.factorize(long["pid"])[0]
+    return long
+
+
+def substitution_times(raw: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Substitution events and per-player typical check-in / check-out times.
+
+    Starters of a period are not "subs in" and players on at the buzzer are not "subs out".
+    Times are game-clock seconds elapsed (sStart / sEnd) plus seconds into the period.
+
+    Returns (events, summary):
+      events: one row per check-in / check-out (game, periodNumber, player, event, game_sec, period_sec)
+      summary: per player x period counts and median / quartile check-in and check-out times
+    """
+    df = _ordered_stints(raw)
+    long = _player_long(df)
+    if long.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    block = df["block_id"].to_numpy()
+    long["block_id"] = block[long["row"].to_numpy()]
+    long = long.sort_values(["player_code", "row"], kind="mergesort").reset_index(drop=True)
+
+    row = long["row"].to_numpy()
+    pcode = long["player_code"].to_numpy()
+    lblock = long["block_id"].to_numpy()
+
+    same_prev = np.zeros(len(long), dtype=bool)
+    same_prev[1:] = (pcode[1:] == pcode[:-1]) & (lblock[1:] == lblock[:-1]) & (row[1:] == row[:-1] + 1)
+    same_next = np.zeros(len(long), dtype=bool)
+    same_next[:-1] = same_prev[1:]
+
+    block_first = np.r_[True, block[1:] != block[:-1]]
+    block_last = np.r_[block[1:] != block[:-1], True]
+
+    sub_in = ~same_prev & ~block_first[row]
+    sub_out = ~same_next & ~block_last[row]
+
+    s_start = df["sStart"].to_numpy(dtype=float)
+    s_end = df["sEnd"].to_numpy(dtype=float)
+    period_start = df.groupby("block_id")["sStart"].transform("min").to_numpy(dtype=float)
+
+    ev_in = long[sub_in].assign(event="in", game_sec=s_start[row[sub_in]])
+    ev_out = long[sub_out].assign(event="out", game_sec=s_end[row[sub_out]])
+    events = pd.concat([ev_in, ev_out], ignore_index=True)
+    ev_rows = events["row"].to_numpy()
+    events["period_sec"] = events["game_sec"].to_numpy() - period_start[ev_rows]
+    events["game"] = df["game"].to_numpy()[ev_rows]
+    events["periodNumber"] = df["periodNumber"].to_numpy()[ev_rows]
+
+    firsts = long.drop_duplicates("player_code")
+    label_by_code = pd.Series(
+        [ul.player_initial(p, n) for p, n in zip(firsts["pid"], firsts["pname"])],
+        index=firsts["player_code"].to_numpy(),
+    )
+    events["player"] = label_by_code.reindex(events["player_code"].to_numpy()).to_numpy()
+    events = events[["game", "periodNumber", "player", "pid", "event", "game_sec", "period_sec"]]
+    events = events.sort_values(["game", "game_sec", "event"]).reset_index(drop=True)
+
+    grouped = events.groupby(["player", "periodNumber", "event"])["period_sec"]
+    summary = pd.concat(
+        {
+            "n": grouped.size(),
+            "q25": grouped.quantile(0.25),
+            "median": grouped.median(),
+            "q75": grouped.quantile(0.75),
+        },
+        axis=1,
+    ).unstack("event")
+    summary.columns = [f"{stat}_{ev}" for stat, ev in summary.columns]
+    summary = summary.reset_index()
+    count_cols = [c for c in summary.columns if c.startswith("n_")]
+    summary[count_cols] = summary[count_cols].fillna(0).astype(int)
+
+    return events, summary
+
+
+def stint_lengths(raw: pd.DataFrame, quantiles: Tuple[float, ...] = (0.1, 0.25, 0.5, 0.75, 0.9)) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Lineup run lengths (consecutive rows with the same five merged) and their per-game distribution.
+
+    Returns (runs, distribution):
+      runs: one row per run (game, periodNumber, lineup, start, end, secs, n_rows)
+      distribution: per game count / mean / quantiles of run secs, plus an "ALL" row
+    """
+    df = _ordered_stints(raw)
+    if df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    df["run_id"] = np.cumsum(_new_run(df)) - 1
+
+    runs = (
+        df.groupby("run_id", sort=True)
+        .agg(
+            game=("game", "first"),
+            periodNumber=("periodNumber", "first"),
+            lineup=("lineup", "first"),
+            start=("sStart", "min"),
+            end=("sEnd", "max"),
+            secs=("secs", "sum"),
+            n_rows=("secs", "size"),
+        )
+        .reset_index(drop=True)
+    )
+
+    qs = list(quantiles)
+    grouped = runs.groupby("game")["secs"]
+    dist = grouped.quantile(qs).unstack()
+    dist.loc["ALL"] = runs["secs"].quantile(qs)
+    dist.columns = [f"p{int(round(q * 100))}_secs" for q in qs]
+    dist.insert(0, "mean_secs", pd.concat([grouped.mean(), pd.Series({"ALL": runs["secs"].mean()})]))
+    dist.insert(0, "n_runs", pd.concat([grouped.size(), pd.Series({"ALL": len(runs)})]).astype(int))
+    dist = dist.rename_axis("game").reset_index()
+
+    return runs, dist
+
+
+if __name__ == "__main__":
+    raw = ul.load_game_recaps("Game Recaps")
+    trans = lineup_transitions(raw)
+    events, subs = substitution_times(raw)
+    runs, dist = stint_lengths(raw)
+
+    trans.to_csv("Lineup Data/lineup_transitions_all_games.csv", index=False)
+    subs.to_csv("Lineup Data/substitution_times_all_games.csv", index=False)
+    dist.to_csv("Lineup Data/stint_length_distribution_all_games.csv", index=False)
+    print(trans.head(10))
+    print(subs.head(12))
+    print(dist)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+stint_bitmaps.py
+
+Bitmap indexes over RAW stint rows for instant split filters.
+
+"Lineups with JL and CH both on court in the second half while leading" used to be a
+full boolean scan. StintBitmapIndex precomputes one packed bitmap (np.packbits, 1 bit
+per stint row) for every:
+- player on court (keyed by initials, e.g. "JL")
+- period (1, 2, 3, 4, 5 = OT, ...)
+- game
+- score-state bucket at stint start (see SCORE_BUCKETS)
+
+Filters are then bitwise AND / OR / NOT on uint8 arrays and only the selected rows go
+through updated_lineups.summarize_stints.
+
+Call:
+    import updated_lineups as ul
+    from stint_bitmaps import StintBitmapIndex
+
+    idx = StintBitmapIndex(ul.load_game_recaps("Game Recaps"))
+    sel = idx.player("JL") & idx.player("CH") & idx.periods(3, 4) & idx.score("leading")
+    summary = idx.summarize(sel)
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import updated_lineups as ul
+
+# name -> (low, high) margin at stint start, inclusive on both ends (team score - opponent score)
+SCORE_BUCKETS: Dict[str, Tuple[float, float]] = {
+    "trailing_big": (-np.inf, -10),
+    "trailing": (-np.inf, -1),
+    "tied": (0, 0),
+    "leading": (1, np.inf),
+    "leading_big": (10, np.inf),
+    "close": (-5, 5),
+}
+
+
+class Bitmap:
+    """Packed row bitmap of fixed length supporting &, |, ^ and ~."""
+
+    __slots__ = ("bits", "n")
+
+    def __init__(self, bits: np.ndarray, n: int):
+        self.bits = bits
+        self.n = n
+
+    @classmethod
+    def from_bool(cls, mask: np.ndarray) -> "Bitmap":
+        return cls(np.packbits(mask.astype(bool)), len(mask))
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, n: int) -> "Bitmap":
+        mask = np.zeros(n, dtype=bool)
+        mask[rows] = True
+        return cls.from_bool(mask)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits & other.bits, self.n)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits | other.bits, self.n)
+
+    def __xor__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(self.bits ^ other.bits, self.n)
+
+    def __invert__(self) -> "Bitmap":
+        # padding bits past n must stay 0 so count() / to_bool() remain exact
+        return Bitmap(~self.bits & np.packbits(np.ones(self.n, dtype=bool)), self.n)
+
+    def to_bool(self) -> np.ndarray:
+        return np.unpackbits(self.bits, count=self.n).astype(bool)
+
+    def rows(self) -> np.ndarray:
+        return np.flatnonzero(self.to_bool())
+
+    def count(self) -> int:
+        return int(np.unpackbits(self.bits).sum())
+
+
+def _bitmaps_by_key(keys: np.ndarray, rows: np.ndarray, n: int) -> Dict[Hashable, Bitmap]:
+    """One bitmap per distinct key, built from a single sort of (key, row) pairs."""
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    out: Dict[Hashable, Bitmap] = {}
+    for key, part in zip(uniques, np.split(rows[order], bounds)):
+        out[key] = Bitmap.from_rows(part, n)
+    return out
+
+
+class StintBitmapIndex:
+    """
+    Bitmap indexes over a stint table (as returned by updated_lineups.load_game_recaps).
+
+    The table is reset to a 0..n-1 index; bitmaps refer to those positions.
+    """
+
+    def __init__(self, raw: pd.DataFrame, score_buckets: Dict[str, Tuple[float, float]] = SCORE_BUCKETS):
+        df = raw.reset_index(drop=True)
+        if "lineup" not in df.columns:
+            df = ul.add_lineup_codes(df.copy())
+        self.df = df
+        self.n = n = len(df)
+        all_rows = np.arange(n)
+
+        # players: one (row, initial) pair per on-court slot
+        pids = df[ul.PID_COLS].astype("string").fillna("").to_numpy(dtype=str)
+        name_cols = [f"pName{i}" for i in range(1, 6)]
+        names = (
+            df[name_cols].astype("string").fillna("").to_numpy(dtype=str)
+            if all(c in df.columns for c in name_cols)
+            else np.full_like(pids, "")
+        )
+        flat_pid = np.char.strip(pids.ravel())
+        flat_name = names.ravel()
+        slot_rows = np.repeat(all_rows, 5)
+        keep = flat_pid != ""
+        pid_codes, pid_uniques = pd.factorize(flat_pid[keep])
+        _, first = np.unique(pid_codes, return_index=True)
+        labels = np.array(
+            [ul.player_initial(p, nm) for p, nm in zip(pid_uniques, flat_name[keep][first])],
+            dtype=object,
+        )
+        self.players = _bitmaps_by_key(labels[pid_codes], slot_rows[keep], n)
+
+        self.periods_ = _bitmaps_by_key(df["periodNumber"].to_numpy(), all_rows, n) if "periodNumber" in df else {}
+        self.games = _bitmaps_by_key(df["game"].to_numpy(), all_rows, n) if "game" in df else {}
+
+        self.scores: Dict[str, Bitmap] = {}
+        if {"scoreStart", "scoreStartAgst"}.issubset(df.columns):
+            margin = (df["scoreStart"] - df["scoreStartAgst"]).to_numpy(dtype=float)
+            for name, (lo, hi) in score_buckets.items():
+                self.scores[name] = Bitmap.from_bool((margin >= lo) & (margin <= hi))
+
+    # ---- lookups ----
+    def _get(self, table: Dict[Hashable, Bitmap], key: Hashable, what: str) -> Bitmap:
+        if not table:
+            raise KeyError(f"No {what} bitmaps were built (column missing from stint table).")
+        bm = table.get(key)
+        return self.none() if bm is None else bm
+
+    def all(self) -> Bitmap:
+        return Bitmap.from_bool(np.ones(self.n, dtype=bool))
+
+    def none(self) -> Bitmap:
+        return Bitmap.from_bool(np.zeros(self.n, dtype=bool))
+
+    def player(self, initial: str) -> Bitmap:
+        return self._get(self.players, initial, "player")
+
+    def period(self, number: int) -> Bitmap:
+        return self._get(self.periods_, number, "period")
+
+    def periods(self, *numbers: int) -> Bitmap:
+        out = self.none()
+        for p in numbers:
+            out = out | self.period(p)
+        return out
+
+    def game(self, name: str) -> Bitmap:
+        return self._get(self.games, str(name).lower(), "game")
+
+    def score(self, bucket: str) -> Bitmap:
+        if bucket not in self.scores:
+            raise KeyError(f"Unknown score bucket {bucket!r}. Known: {list(self.scores)}")
+        return self.scores[bucket]
+
+    def with_all(self, initials: Iterable[str]) -> Bitmap:
+        out = self.all()
+        for p in initials:
+            out = out & self.player(p)
+        return out
+
+    def with_any(self, initials: Iterable[str]) -> Bitmap:
+        out = self.none()
+        for p in initials:
+            out = out | self.player(p)
+        return out
+
+    # ---- aggregation ----
+    def select(self, mask: Bitmap) -> pd.DataFrame:
+        return self.df.iloc[mask.rows()]
+
+    def summarize(self, mask: Bitmap) -> pd.DataFrame:
+        """
+        Lineup summary (updated_lineups.summarize_stints) over the selected stints only.
+        An empty split gives an empty frame with the usual summary columns.
+        """
+        rows = self.select(mask)
+        if rows.empty:
+            print("No stints match this split.")
+        return ul.summarize_stints(rows)
+
+    def describe(self) -> pd.DataFrame:
+        """Row counts per bitmap, handy for sanity-checking keys."""
+        parts: List[dict] = []
+        for kind, table in (("player", self.players), ("period", self.periods_), ("game", self.games), ("score", self.scores)):
+            for key, bm in table.items():
+                parts.append({"kind": kind, "key": key, "rows": bm.count()})
+        return pd.DataFrame(parts)
+
+
+if __name__ == "__main__":
+    idx = StintBitmapIndex(ul.load_game_recaps("Game Recaps"))
+    sel = idx.player("JL") & idx.player("CH") & idx.periods(3, 4) & idx.score("leading")
+    print(f"{sel.count()} stints with JL + CH, second half, leading")
+    print(idx.summarize(sel))
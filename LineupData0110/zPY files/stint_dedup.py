@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+stint_dedup.py
+
+Ingest-time deduplication of raw stint rows.
+
+Copies of game files ("utahvalley copy.csv", the prewichita folder next to Game Recaps)
+double-count stints when globbed together. StintDedupIndex keeps:
+- a content hash of every file already ingested, with the path it came from (a file with
+  the same bytes under a *different* path is a copy and is skipped before it is parsed)
+- a 64-bit hash of every stint `_id` already ingested (falls back to `rowId`) and the file
+  that owns it; a row is dropped only when another file already owns its id
+
+Ids live in a sorted uint64 array (8 bytes per stint, plus a 4-byte owner code): rows are
+hashed with pd.util.hash_array and looked up with np.searchsorted, so a chunk of stints is
+filtered in a few vectorized passes. The index can be persisted to a .npz. Re-reading a
+file under the path that owns it is a rerun, not a copy: seen_file() releases that file's
+old ids, so a rerun returns the file's full stints again (edited files are re-read too).
+When the same stints sit in an original and a copy, whichever file is read first keeps
+them, so callers order paths with is_copy_name() last ("x.csv" before "x copy.csv").
+
+Call:
+    from stint_dedup import StintDedupIndex
+    idx = StintDedupIndex("Lineup Data/stint_index.npz")   # or StintDedupIndex() for in-memory
+    if not idx.seen_file(path):
+        df = idx.filter_rows(pd.read_csv(path), source=path)
+    idx.save()
+    print(idx.report())
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ID_COLS = ["_id", "rowId"]
+COPY_RE = re.compile(r"( copy( \d+)?| \(\d+\))$", re.IGNORECASE)  # "x copy", "x copy 2", "x (1)"
+
+
+def is_copy_name(path: str) -> bool:
+    """True for Finder / Explorer duplicate names ("utahvalley copy.csv", "wichita (1).csv")."""
+    return bool(COPY_RE.search(os.path.splitext(os.path.basename(str(path)))[0]))
+
+
+def hash_ids(values) -> np.ndarray:
+    """uint64 hash of each stint id (as text, so "123" and 123 agree)."""
+    return pd.util.hash_array(pd.Series(values).astype(str).to_numpy(dtype=object))
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """sha1 of the raw file bytes (read in chunks, no CSV parsing)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class StintDedupIndex:
+    """
+    Persistent set of seen stint ids and file digests.
+
+    path: optional .npz location. Loaded on construction if it exists; written by save().
+    Call seen_file(path) before filter_rows(..., source=path) for each file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._hashes = np.empty(0, dtype=np.uint64)  # sorted
+        self._owners = np.empty(0, dtype=np.int32)  # source code of each hash
+        self._sources: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._file_digests: Dict[str, str] = {}  # digest -> path
+        self._dropped: List[dict] = []
+
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                self._file_digests = dict(zip(data["file_digests"].tolist(), data["file_names"].tolist()))
+                if "owners" in data:  # older indexes without owners only keep their file digests
+                    self._hashes = data["row_hashes"].astype(np.uint64)
+                    self._owners = data["owners"].astype(np.int32)
+                    self._sources = data["sources"].tolist()
+                    self._codes = {src: i for i, src in enumerate(self._sources)}
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _code(self, source: str) -> int:
+        if source not in self._codes:
+            self._codes[source] = len(self._sources)
+            self._sources.append(source)
+        return self._codes[source]
+
+    def seen_file(self, path: str) -> bool:
+        """
+        True if identical bytes were already ingested from a different path (the drop is
+        recorded). Otherwise the file is (re)registered under its digest, any ids it owned
+        from an earlier ingest are released, and False is returned.
+        """
+        digest = file_digest(path)
+        original = self._file_digests.get(digest)
+        if original is not None and original != path:
+            self._dropped.append(
+                {"source": path, "kind": "file", "duplicate_of": original, "rows": np.nan}
+            )
+            return True
+        self._file_digests = {d: p for d, p in self._file_digests.items() if p != path}
+        self._file_digests[digest] = path
+        code = self._codes.get(path)
+        if code is not None:
+            keep = self._owners != code
+            self._hashes, self._owners = self._hashes[keep], self._owners[keep]
+        return False
+
+    def filter_rows(self, df: pd.DataFrame, source: str = "") -> pd.DataFrame:
+        """Drop rows whose id another file already owns (or repeats within df) and register the rest."""
+        id_col = next((c for c in ID_COLS if c in df.columns), None)
+        if id_col is None or df.empty:
+            return df
+
+        hashes = hash_ids(df[id_col])
+        pos = np.searchsorted(self._hashes, hashes)
+        found = pos < len(self._hashes)
+        already = np.zeros(len(hashes), dtype=bool)
+        already[found] = self._hashes[pos[found]] == hashes[found]
+        # repeats inside this same frame count as duplicates too
+        already |= pd.Series(hashes).duplicated().to_numpy()
+
+        n_dropped = int(already.sum())
+        if n_dropped:
+            self._dropped.append(
+                {"source": source, "kind": "rows", "duplicate_of": "", "rows": n_dropped}
+            )
+        new = np.sort(hashes[~already])
+        if len(new):
+            merged = np.concatenate([self._hashes, new])
+            owners = np.concatenate([self._owners, np.full(len(new), self._code(source), dtype=np.int32)])
+            order = np.argsort(merged, kind="stable")  # two sorted runs: a linear merge
+            self._hashes, self._owners = merged[order], owners[order]
+        return df[~already] if n_dropped else df
+
+    def report(self) -> pd.DataFrame:
+        """What was dropped so far in this session (one row per skipped file / per file with dropped rows)."""
+        return pd.DataFrame(self._dropped, columns=["source", "kind", "duplicate_of", "rows"])
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if not path:
+            raise ValueError("No path given for StintDedupIndex.save().")
+        np.savez_compressed(
+            path,
+            row_hashes=self._hashes,
+            owners=self._owners,
+            sources=np.array(self._sources, dtype=str),
+            file_digests=np.array(list(self._file_digests.keys()), dtype=str),
+            file_names=np.array(list(self._file_digests.values()), dtype=str),
+        )
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+stint_moments.py
+
+Mergeable streaming moments of per-stint points per possession, so aggregated lineup /
+combo rows can say how noisy their scoring is without a bootstrap.
+
+For each side (o: ptsScored / oPoss, d: ptsAgst / dPoss) a group carries
+    <side>_ppp_n, <side>_ppp_mean, <side>_ppp_m2        (count, mean, sum of squared deviations)
+over its stints with at least one possession. Partial aggregates from different files,
+chunks or workers combine exactly with Chan et al.'s parallel update:
+    n = na + nb,  delta = mean_b - mean_a
+    mean = mean_a + delta * nb / n
+    m2 = m2_a + m2_b + delta^2 * na * nb / n
+and variance / standard error fall out at the end (add_moment_stats).
+
+Call:
+    from stint_moments import stint_moments, merge_moments, add_moment_stats
+    m = merge_moments(stint_moments(chunk_a, "lineup"), stint_moments(chunk_b, "lineup"))
+    add_moment_stats(m)     # o_ppp_var, o_ppp_se, d_ppp_var, d_ppp_se
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# side -> (points column, possessions column) in raw stint rows
+SIDES = {"o": ("ptsScored", "oPoss"), "d": ("ptsAgst", "dPoss")}
+MOMENT_COLS: List[str] = [f"{s}_ppp_{m}" for s in SIDES for m in ("n", "mean", "m2")]
+
+
+def stint_moments(df: pd.DataFrame, by: Union[str, Sequence[str]]) -> pd.DataFrame:
+    """Per-group count / mean / M2 of per-stint points per possession (two-pass within each group)."""
+    keys = df[by] if isinstance(by, str) else [df[c] for c in by]
+    out = {}
+    for side, (pts, poss) in SIDES.items():
+        p = df[poss].to_numpy(dtype=float)
+        x = pd.Series(np.where(p > 0, df[pts].to_numpy(dtype=float) / np.where(p > 0, p, 1.0), np.nan), index=df.index)
+        g = x.groupby(keys)
+        mean = g.transform("mean")
+        out[f"{side}_ppp_n"] = g.count()
+        out[f"{side}_ppp_mean"] = g.mean().fillna(0.0)
+        out[f"{side}_ppp_m2"] = ((x - mean) ** 2).groupby(keys).sum()
+    return pd.DataFrame(out)[MOMENT_COLS]
+
+
+def merge_moments(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """Chan merge of two moment tables aligned on their index (groups missing on one side pass through)."""
+    idx = a.index.union(b.index, sort=False)
+    a, b = a.reindex(idx, fill_value=0), b.reindex(idx, fill_value=0)
+    out = {}
+    for side in SIDES:
+        na = a[f"{side}_ppp_n"].to_numpy(dtype=float)
+        nb = b[f"{side}_ppp_n"].to_numpy(dtype=float)
+        ma, mb = a[f"{side}_ppp_mean"].to_numpy(dtype=float), b[f"{side}_ppp_mean"].to_numpy(dtype=float)
+        n = na + nb
+        safe_n = np.where(n > 0, n, 1.0)
+        delta = mb - ma
+        out[f"{side}_ppp_n"] = n.astype(np.int64)
+        out[f"{side}_ppp_mean"] = np.where(n > 0, ma + delta * nb / safe_n, 0.0)
+        out[f"{side}_ppp_m2"] = (
+            a[f"{side}_ppp_m2"].to_numpy(dtype=float)
+            + b[f"{side}_ppp_m2"].to_numpy(dtype=float)
+            + np.where(n > 0, delta ** 2 * na * nb / safe_n, 0.0)
+        )
+    return pd.DataFrame(out, index=idx)[MOMENT_COLS]
+
+
+def combine_moments(df: pd.DataFrame, by: Union[str, Sequence[str]]) -> pd.DataFrame:
+    """
+    k-way merge of per-row moments within groups (e.g. lineup rows -> pair / trio combos).
+    Same result as folding merge_moments row by row:
+        mean = sum(n_i mean_i) / n,  m2 = sum(m2_i) + sum(n_i (mean_i - mean)^2)
+    """
+    keys = df[by] if isinstance(by, str) else [df[c] for c in by]
+    out = {}
+    for side in SIDES:
+        n_i = df[f"{side}_ppp_n"].astype(float)
+        mean_i = df[f"{side}_ppp_mean"].astype(float)
+        n = n_i.groupby(keys).transform("sum")
+        mean = (n_i * mean_i).groupby(keys).transform("sum") / n.where(n > 0, 1.0)
+        out[f"{side}_ppp_n"] = n_i.groupby(keys).sum().astype(np.int64)
+        out[f"{side}_ppp_mean"] = mean.groupby(keys).first()
+        out[f"{side}_ppp_m2"] = (df[f"{side}_ppp_m2"] + n_i * (mean_i - mean) ** 2).groupby(keys).sum()
+    return pd.DataFrame(out)[MOMENT_COLS]
+
+
+def add_moment_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Sample variance and standard error of per-stint PPP for each side (NaN below 2 stints)."""
+    for side in SIDES:
+        n = df[f"{side}_ppp_n"].astype(float)
+        var = df[f"{side}_ppp_m2"] / (n - 1).where(n > 1)
+        df[f"{side}_ppp_var"] = var
+        df[f"{side}_ppp_se"] = np.sqrt(var / n)
+    return df
@@ -1,6 +1,13 @@
-import pandas as pd
+import json
+import os
 from itertools import combinations
 
+import numpy as np
+import pandas as pd
+
+from columnar_io import read_table, write_table
+from stint_moments import MOMENT_COLS, add_moment_stats, combine_moments
+
 def _safe_div(numer, denom):
     return numer / denom if denom else 0
 
@@ -33,47 +40,114 @@ def sort_players_by_height(players, player_info):
     return tuple(sorted(players, key=sort_key))
 
 
-def analyze_combos(
-    lineup_summary_path="Lineup Data/lineup_summary_all_games.csv",
-    output_path="Lineup Data/pair_analysis_all_games.csv",
-    combo_size=2,
-    min_minutes=10,
-):
+COMBO_STAT_COLS = ["minutes", "pts_for", "pts_against", "o_poss", "d_poss"]
+
+
+def _explode_combos(df, combo_size):
     """
-    Build N-player combo metrics from a lineup summary table produced by updated_lineups.py.
-    combo_size=2 -> pairs, combo_size=3 -> trios, etc.
+    One row per (lineup, combo) with the combo's players in canonical height order.
+    Works on the whole lineup table at once: each combination of the 5 slots is a column pick.
     """
-    if combo_size < 2 or combo_size > 5:
-        raise ValueError("combo_size must be between 2 and 5 (lineups have 5 players).")
+    players = df["lineup"].str.split("-", expand=True)
+    if players.shape[1] != 5 or players.isna().any().any():
+        raise ValueError("Every lineup must have exactly 5 players (e.g. 'JL-AM-IK-MH-CH').")
+    players = players.to_numpy(dtype=object)
+
+    # canonical ordering so the same trio groups together even if lineup order changes
+    unique = sort_players_by_height(set(players.ravel()), PLAYER_INFO)
+    rank = {p: i for i, p in enumerate(unique)}
+    ranks = np.vectorize(rank.__getitem__, otypes=[np.int64])(players)
+
+    # lineup summaries written before the PPP moments existed simply don't carry them
+    stat_cols = COMBO_STAT_COLS + [c for c in MOMENT_COLS if c in df.columns]
+    stats = df[stat_cols].reset_index(drop=True)
+    frames = []
+    for slots in combinations(range(5), combo_size):
+        slots = list(slots)
+        order = np.argsort(ranks[:, slots], axis=1, kind="stable")
+        combo_players = np.take_along_axis(players[:, slots], order, axis=1)
+        part = stats.copy()
+        for i in range(combo_size):
+            part[f"player{i + 1}"] = combo_players[:, i]
+        frames.append(part)
+
+    # keep lineup-major row order so group sums add up in the same order as a row-by-row walk
+    out = pd.concat(frames)
+    return out.sort_index(kind="stable").reset_index(drop=True)
+
+
+def combo_index_path(output_path):
+    """Where the player -> row offsets index for a combo CSV lives (next to it)."""
+    root, _ = os.path.splitext(output_path)
+    return f"{root}.index.json"
+
+
+def build_combo_index(combo_stats, combo_size=None):
+    """
+    Inverted index: player -> sorted row offsets (positions) of every combo containing them.
+    """
+    if combo_size is None:
+        combo_size = sum(1 for c in combo_stats.columns if c.startswith("player"))
+    cols = [f"player{i}" for i in range(1, combo_size + 1)]
 
-    df = pd.read_csv(lineup_summary_path)
-    if df.empty:
-        print("Lineup summary is empty; no combos to analyze.")
+    flat = combo_stats[cols].to_numpy(dtype=object).ravel()
+    rows = np.repeat(np.arange(len(combo_stats)), combo_size)
+    codes, uniques = pd.factorize(flat)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return {p: part for p, part in zip(uniques, np.split(rows[order], bounds))}
+
+
+def _file_signature(path):
+    """mtime + size of the combo CSV the index was built from (None if it does not exist)."""
+    if not os.path.exists(path):
         return None
+    st = os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def save_combo_index(index, path, n_rows, source=None):
+    """source: the combo CSV the offsets point into; its signature is stored to detect rewrites."""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "n_rows": int(n_rows),
+                "source": _file_signature(source) if source else None,
+                "players": {p: o.tolist() for p, o in index.items()},
+            },
+            f,
+        )
+
 
-    rows = []
-    for _, row in df.iterrows():
-        players = row["lineup"].split("-")
+def load_combos(path="Lineup Data/pair_analysis_all_games.csv"):
+    """
+    Load a combo CSV and its player index. Rebuilds the index if it is missing or stale
+    (row count, or the CSV's mtime / size, differ from when the index was saved).
+    Returns (combos, index).
+    """
+    combos = read_table(path)
+    idx_path = combo_index_path(path)
+    if os.path.exists(idx_path):
+        with open(idx_path) as f:
+            data = json.load(f)
+        if data.get("n_rows") == len(combos) and data.get("source") == _file_signature(path):
+            return combos, {p: np.asarray(o, dtype=np.int64) for p, o in data["players"].items()}
+    return combos, build_combo_index(combos)
 
-        # combos(players, 3) yields tuples like ('JL','MH','AM')
-        for combo in combinations(players, combo_size):
-            # canonical ordering so the same trio groups together even if lineup order changes
-            combo = sort_players_by_height(combo, PLAYER_INFO)
 
-            out = {
-                "minutes": row["minutes"],
-                "pts_for": row["pts_for"],
-                "pts_against": row["pts_against"],
-                "o_poss": row["o_poss"],
-                "d_poss": row["d_poss"],
-            }
-            for i, p in enumerate(combo, start=1):
-                out[f"player{i}"] = p
+def combos_for_player(combos, index, player):
+    """All combo rows containing `player`, by direct offset lookup (no mask over the table)."""
+    return combos.iloc[index.get(player, np.empty(0, dtype=np.int64))]
 
-            rows.append(out)
 
+def combo_summary(df, combo_size=2, min_minutes=10):
+    """
+    N-player combo metrics from a lineup summary DataFrame (no file I/O); None if there are no combos.
+    """
+    if combo_size < 2 or combo_size > 5:
+        raise ValueError("combo_size must be between 2 and 5 (lineups have 5 players).")
 
-    combo_df = pd.DataFrame(rows)
+    combo_df = _explode_combos(df, combo_size)
     if combo_df.empty:
         print("No combos found.")
         return None
@@ -91,6 +165,10 @@ def analyze_combos(
         )
         .reset_index()
     )
+    if set(MOMENT_COLS) <= set(combo_df.columns):
+        # each combo's stints are the union of its lineups' stints, so lineup moments merge exactly
+        moments = combine_moments(combo_df, group_cols).reset_index()
+        combo_stats = add_moment_stats(combo_stats.merge(moments, on=group_cols, how="left"))
 
     combo_stats["plus_minus"] = combo_stats["pts_for"] - combo_stats["pts_against"]
     combo_stats["off_rtg"] = (
@@ -127,8 +205,35 @@ def analyze_combos(
 
     # nice-to-have sort
     combo_stats = combo_stats.sort_values(["minutes", "net_rtg"], ascending=[False, False])
+    combo_stats = combo_stats.reset_index(drop=True)
+
+    return combo_stats
 
-    combo_stats.to_csv(output_path, index=False)
+
+def analyze_combos(
+    lineup_summary_path="Lineup Data/lineup_summary_all_games.csv",
+    output_path="Lineup Data/pair_analysis_all_games.csv",
+    combo_size=2,
+    min_minutes=10,
+):
+    """
+    Build N-player combo metrics from a lineup summary table produced by updated_lineups.py.
+    combo_size=2 -> pairs, combo_size=3 -> trios, etc.
+    Also writes the player -> row offsets index next to output_path (see combo_index_path).
+    """
+    df = read_table(lineup_summary_path, round=None)
+    if df.empty:
+        print("Lineup summary is empty; no combos to analyze.")
+        return None
+
+    combo_stats = combo_summary(df, combo_size=combo_size, min_minutes=min_minutes)
+    if combo_stats is None:
+        return None
+
+    write_table(combo_stats, output_path)
+    save_combo_index(
+        build_combo_index(combo_stats, combo_size), combo_index_path(output_path), len(combo_stats), source=output_path
+    )
     print(f"Exported {combo_size}-player combo analysis to {output_path}")
     return combo_stats
 
@@ -1,19 +1,27 @@
 import numpy as np
 import pandas as pd
 
+from columnar_io import read_table, write_table
 
-def summarize_individuals(
-    lineup_summary_path="Lineup Data/lineup_summary_all_games.csv",
-    output_path="Lineup Data/individual_summary_all_games.csv",
-):
+INDIVIDUAL_ROUNDING = {
+    "off_rtg": 2,
+    "def_rtg": 2,
+    "o_poss": 1,
+    "d_poss": 1,
+    "plus_minus": 1,
+    "minutes": 1,
+    "net_rtg": 2,
+    "PM_p40": 2,
+    "team_PM_p40": 2,
+    "team_off_rtg": 2,
+    "team_def_rtg": 2,
+}
+
+
+def individual_summary(df):
     """
-    Build individual PM and efficiency splits from a lineup summary produced by updated_lineups_copy.py.
+    Individual PM and efficiency splits from a lineup summary DataFrame (unrounded, sorted by PM_p40).
     """
-    df = pd.read_csv(lineup_summary_path)
-    if df.empty:
-        print("Lineup summary is empty; no individual stats computed.")
-        return None
-
     # Split and explode to one row per player per lineup
     exploded = df.assign(players=df["lineup"].str.split("-")).explode("players")
 
@@ -46,27 +54,28 @@ def summarize_individuals(
     player_summary["team_off_rtg"] = df["team_off_rtg"].iloc[0]
     player_summary["team_def_rtg"] = df["team_def_rtg"].iloc[0]
 
-    # Round for readability
-    player_summary = player_summary.round(
-        {
-            "off_rtg": 2,
-            "def_rtg": 2,
-            "o_poss": 1,
-            "d_poss": 1,
-            "plus_minus": 1,
-            "minutes": 1,
-            "net_rtg": 2,
-            "PM_p40": 2,
-            "team_PM_p40": 2,
-            "team_off_rtg": 2,
-            "team_def_rtg": 2,
-        }
-    )
+    return player_summary.sort_values("PM_p40", ascending=False)
+
 
-    player_summary = player_summary.sort_values("PM_p40", ascending=False)
-    player_summary.to_csv(output_path, index=False)
+def summarize_individuals(
+    lineup_summary_path="Lineup Data/lineup_summary_all_games.csv",
+    output_path="Lineup Data/individual_summary_all_games.csv",
+):
+    """
+    Build individual PM and efficiency splits from a lineup summary produced by updated_lineups_copy.py.
+    The CSV is rounded for readability; the columnar copy (see columnar_io.py) keeps full precision.
+    """
+    df = read_table(lineup_summary_path, round=None)
+    if df.empty:
+        print("Lineup summary is empty; no individual stats computed.")
+        return None
+
+    player_summary = individual_summary(df)
+    write_table(player_summary, output_path, round_csv=INDIVIDUAL_ROUNDING)
     print(f"Exported individual summary to {output_path}")
-    return player_summary
+
+    # Round for readability
+    return player_summary.round(INDIVIDUAL_ROUNDING)
 
 
 if __name__ == "__main__":
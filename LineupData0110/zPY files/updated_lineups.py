@@ -2,6 +2,10 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from columnar_io import write_table
+from stint_dedup import StintDedupIndex, is_copy_name
+from stint_moments import MOMENT_COLS, add_moment_stats, merge_moments, stint_moments
+
 # --- Player Info Dictionary (heights in inches) ---
 # Keyed by official PID so we can join lineup rows that reference pId1..pId5.
 PLAYER_INFO = {
@@ -34,6 +38,12 @@ def _fallback_initial(name, pid):
     return str(pid)
 
 
+def player_initial(pid, name=""):
+    """Initials used in lineup strings for one player (PLAYER_INFO first, then the fallback)."""
+    info = PLAYER_INFO.get(pid)
+    return info["initial"] if info else _fallback_initial(name, pid)
+
+
 def create_height_sorted_lineup(row):
     """Create a consistent lineup string ordered by player height."""
     players = []
@@ -55,53 +65,136 @@ def create_height_sorted_lineup(row):
     return "-".join(p["initial"] for p in sorted_players)
 
 
+PID_COLS = [f"pId{i}" for i in range(1, 6)]
+
+
+def add_lineup_codes(df):
+    """
+    Add `lineup` (height-sorted initials) and `lineup_code` (int) columns to stint rows.
+
+    The five pIds are sorted per row with numpy to build an order-free key, so
+    create_height_sorted_lineup only runs once per distinct lineup instead of once per stint.
+    """
+    if df.empty:
+        df["lineup"] = pd.Series(dtype="object")
+        df["lineup_code"] = pd.Series(dtype="int64")
+        return df
+
+    pids = df[PID_COLS].astype("string").fillna("").apply(lambda c: c.str.strip())
+    pids = np.sort(pids.to_numpy(dtype=str), axis=1)
+    key = pd.Series(pids[:, 0], index=df.index)
+    for i in range(1, 5):
+        key = key + "-" + pids[:, i]
+
+    key_codes, _ = pd.factorize(key)
+    _, first_rows = np.unique(key_codes, return_index=True)
+    labels = df.iloc[first_rows].apply(create_height_sorted_lineup, axis=1).to_numpy()
+
+    # Distinct keys can still collapse to one label (fallback initials), so re-encode on the label
+    df["lineup"] = labels[key_codes]
+    df["lineup_code"] = pd.factorize(df["lineup"])[0]
+    return df
+
+
 def _safe_div(numer, denom):
     return numer / denom if denom else 0
 
 
-def load_game_recaps(base_dir="Game Recaps", games=None):
+def iter_game_recaps(base_dir="Game Recaps", games=None, recursive=False, dedupe=True, dedupe_index=None, chunksize=None):
     """
-    Load and concatenate lineup flow CSVs from a directory, adding a `game` column.
-    games: optional list of game names (matching file stems, case-insensitive) to include.
+    Yield lineup flow CSVs from a directory one DataFrame at a time, each with a `game` column.
+    Same arguments as load_game_recaps; chunksize additionally splits each file into row chunks
+    (pandas read_csv chunks), so memory stays bounded by the chunk, not the file.
+    dedupe="files" skips byte-identical copies only (no per-stint id index is kept).
     """
     base_path = Path(base_dir)
     if not base_path.exists():
         raise FileNotFoundError(f"Base directory not found: {base_dir}")
 
     game_filter = set(g.lower() for g in games) if games else None
-    frames = []
+    if dedupe and dedupe_index is None:
+        dedupe_index = StintDedupIndex()
+    index = dedupe_index if dedupe else None
 
-    for csv_path in sorted(base_path.glob("*.csv")):
+    csv_paths = base_path.rglob("*.csv") if recursive else base_path.glob("*.csv")
+    # originals before "x copy.csv" / "x (1).csv", so the dedupe index keeps the original's stints
+    for csv_path in sorted(csv_paths, key=lambda p: (is_copy_name(p), str(p))):
         game_name = csv_path.stem.lower()
         if game_filter and game_name not in game_filter:
             continue
-        import pandas as pd
-
-        pid_cols = [f"pId{i}" for i in range(1, 6)]
+        if index is not None and index.seen_file(str(csv_path)):
+            continue
 
-        df = pd.read_csv(
+        reader = pd.read_csv(
             csv_path,
-            dtype={c: "string" for c in pid_cols}  # <- critical
-)
+            dtype={c: "string" for c in PID_COLS},  # <- critical
+            chunksize=chunksize,
+        )
+        for df in (reader if chunksize else [reader]):
+            if index is not None and dedupe != "files":
+                df = index.filter_rows(df, source=str(csv_path))
+            df["game"] = game_name
+            yield df
+
+    if index is not None:
+        dropped = index.report()
+        if not dropped.empty:
+            print(f"Skipped duplicate stints:\n{dropped.to_string(index=False)}")
 
-        df["game"] = game_name
-        frames.append(df)
 
+def load_game_recaps(base_dir="Game Recaps", games=None, recursive=False, dedupe=True, dedupe_index=None):
+    """
+    Load and concatenate lineup flow CSVs from a directory, adding a `game` column.
+    games: optional list of game names (matching file stems, case-insensitive) to include.
+    recursive: also pick up CSVs in subfolders (e.g. Game Recaps/prewichita).
+    dedupe: skip byte-identical files and stint rows whose `_id` was already loaded;
+      "files" skips byte-identical files only.
+    dedupe_index: optional stint_dedup.StintDedupIndex to share / persist across calls.
+    """
+    frames = list(iter_game_recaps(base_dir, games, recursive, dedupe, dedupe_index))
     if not frames:
         return pd.DataFrame()
 
     return pd.concat(frames, ignore_index=True)
 
 
-def process_lineups(base_dir="Game Recaps", games=None, team_id=None):
+def process_lineups(
+    base_dir="Game Recaps",
+    games=None,
+    team_id=None,
+    decimals=3,
+    stream=False,
+    chunksize=200_000,
+    dedupe=None,
+    dedupe_index=None,
+):
     """
     Process multiple game recap CSVs and return aggregated lineup metrics.
 
     base_dir: folder containing game recap CSVs.
     games: optional list of game names to include (match CSV stems, e.g., ["utahstate","wichita"]).
     team_id: optional numeric filter if files contain multiple teams.
+    decimals: rounding for numeric columns; None keeps full precision (columnar outputs).
+    stream: fold files / row chunks into running per-lineup sums instead of concatenating every
+      stint first (peak memory ~ distinct lineups + one chunk). Same output as the default path
+      unless partial copies share stints: stream mode only skips whole duplicate files by default.
+    chunksize: rows per chunk in stream mode.
+    dedupe / dedupe_index: as in load_game_recaps. Default: True, or "files" in stream mode so
+      no per-stint id index grows with the data; pass dedupe=True there to opt into row dedupe.
     """
-    df = load_game_recaps(base_dir=base_dir, games=games)
+    if dedupe is None:
+        dedupe = "files" if stream else True
+    if stream:
+        chunks = iter_game_recaps(
+            base_dir=base_dir, games=games, dedupe=dedupe, dedupe_index=dedupe_index, chunksize=chunksize
+        )
+        agg = stream_lineup_sums(chunks, team_id=team_id)
+        if agg.empty:
+            print("No lineup stints found for the given filters.")
+            return None
+        return finalize_lineups(agg, decimals=decimals)
+
+    df = load_game_recaps(base_dir=base_dir, games=games, dedupe=dedupe, dedupe_index=dedupe_index)
     if df.empty:
         print("No lineup stints found for the given filters.")
         return None
@@ -113,34 +206,86 @@ def process_lineups(base_dir="Game Recaps", games=None, team_id=None):
         print("No lineup stints remain after filtering by team.")
         return None
 
-    df["lineup"] = df.apply(create_height_sorted_lineup, axis=1)
-
-    agg = (
-        df.groupby("lineup")
-        .agg(
-            secs=("secs", "sum"),
-            pts_for=("ptsScored", "sum"),
-            pts_against=("ptsAgst", "sum"),
-            net_pts=("netPts", "sum"),
-            o_poss=("oPoss", "sum"),
-            d_poss=("dPoss", "sum"),
-            fgm=("fgm", "sum"),
-            fga=("fga", "sum"),
-            fgm3=("fgm3", "sum"),
-            fga3=("fga3", "sum"),
-            fta=("fta", "sum"),
-            tov=("tov", "sum"),
-            orb=("orb", "sum"),
-            fgm_allowed=("fgmAgst", "sum"),
-            fga_allowed=("fgaAgst", "sum"),
-            fgm3_allowed=("fgm3Agst", "sum"),
-            fga3_allowed=("fga3Agst", "sum"),
-            fta_allowed=("ftaAgst", "sum"),
-            tov_forced=("tovAgst", "sum"),
-            orb_allowed=("orbAgst", "sum"),
-        )
-        .reset_index()
-    )
+    return summarize_stints(df, decimals=decimals)
+
+
+# summed output column -> raw stint column
+BASE_SUMS = {
+    "secs": "secs",
+    "pts_for": "ptsScored",
+    "pts_against": "ptsAgst",
+    "net_pts": "netPts",
+    "o_poss": "oPoss",
+    "d_poss": "dPoss",
+    "fgm": "fgm",
+    "fga": "fga",
+    "fgm3": "fgm3",
+    "fga3": "fga3",
+    "fta": "fta",
+    "tov": "tov",
+    "orb": "orb",
+    "fgm_allowed": "fgmAgst",
+    "fga_allowed": "fgaAgst",
+    "fgm3_allowed": "fgm3Agst",
+    "fga3_allowed": "fga3Agst",
+    "fta_allowed": "ftaAgst",
+    "tov_forced": "tovAgst",
+    "orb_allowed": "orbAgst",
+}
+
+
+def lineup_sums(df):
+    """
+    Per-lineup base sums (BASE_SUMS) of stint rows plus per-stint PPP moments (stint_moments.MOMENT_COLS),
+    indexed by lineup.
+    """
+    if "lineup" not in df.columns:
+        df = add_lineup_codes(df.copy())
+    sums = df.groupby("lineup").agg(**{out: (col, "sum") for out, col in BASE_SUMS.items()})
+    return sums.join(stint_moments(df, "lineup"))
+
+
+def merge_lineup_sums(a, b):
+    """Combine two lineup_sums tables (different files / chunks / workers): sums add, moments Chan-merge."""
+    base = a[list(BASE_SUMS)].add(b[list(BASE_SUMS)], fill_value=0)
+    return base.join(merge_moments(a[MOMENT_COLS], b[MOMENT_COLS]))
+
+
+def stream_lineup_sums(chunks, team_id=None):
+    """
+    Fold an iterable of stint chunks (e.g. iter_game_recaps(..., chunksize=...)) into running
+    per-lineup base sums. Only the accumulator (one row per distinct lineup) outlives each chunk.
+    """
+    acc, int_cols = None, set(BASE_SUMS)
+    for chunk in chunks:
+        if team_id is not None:
+            chunk = chunk[chunk["teamId"] == team_id]
+        if chunk.empty:
+            continue
+        part = lineup_sums(chunk)
+        int_cols &= {c for c in part.columns if pd.api.types.is_integer_dtype(part[c])}
+        acc = part if acc is None else merge_lineup_sums(acc, part)
+    if acc is None:
+        return pd.DataFrame(columns=list(BASE_SUMS) + MOMENT_COLS)
+    # aligning on lineup upcasts to float; keep counts integer like the one-shot groupby
+    return acc.astype({c: np.int64 for c in int_cols})
+
+
+def summarize_stints(df, decimals=3):
+    """
+    Aggregate raw stint rows (any subset: one game, a split, a filtered selection) into lineup metrics.
+    Adds the lineup column via add_lineup_codes if the rows don't carry one yet.
+    decimals: rounding for numeric columns; None keeps full precision.
+    """
+    return finalize_lineups(lineup_sums(df), decimals=decimals)
+
+
+def finalize_lineups(sums, decimals=3):
+    """
+    Derived lineup metrics (rates, ratings, team benchmarks) from per-lineup base sums.
+    sums: lineup_sums / stream_lineup_sums output (lineup index, BASE_SUMS columns).
+    """
+    agg = sums.rename_axis("lineup").reset_index()
 
     agg["minutes"] = agg["secs"] / 60
     agg["poss_total"] = agg["o_poss"] + agg["d_poss"]
@@ -195,9 +340,11 @@ def process_lineups(base_dir="Game Recaps", games=None, team_id=None):
     agg["team_def_rtg"] = team_def_rtg
     agg["team_net_rtg"] = team_net_rtg
     agg["team_PM_p40"] = team_PM_p40
+    agg = add_moment_stats(agg)
 
-    numeric_cols = agg.select_dtypes(include=["float64", "int64"]).columns
-    agg[numeric_cols] = agg[numeric_cols].round(3)
+    if decimals is not None:
+        numeric_cols = agg.select_dtypes(include=["float64", "int64"]).columns
+        agg[numeric_cols] = agg[numeric_cols].round(decimals)
     agg = agg.sort_values(by="minutes", ascending=False).reset_index(drop=True)
     return agg[
         [
@@ -236,15 +383,20 @@ def process_lineups(base_dir="Game Recaps", games=None, team_id=None):
             "team_def_rtg",
             "team_net_rtg",
             "team_PM_p40",
+            *MOMENT_COLS,
+            "o_ppp_var",
+            "o_ppp_se",
+            "d_ppp_var",
+            "d_ppp_se",
         ]
     ]
 
 
 if __name__ == "__main__":
     games_to_include = None
-    summary = process_lineups(base_dir="Game Recaps", games=games_to_include)
+    summary = process_lineups(base_dir="Game Recaps", games=games_to_include, decimals=None)
     if summary is not None:
         output_path = "Lineup Data/lineup_summary_all_games.csv" if games_to_include is None else \
             f"Lineup Data/Game Lineups/lineup_summary_{'_'.join(games_to_include)}.csv"
-        summary.to_csv(output_path, index=False)
+        write_table(summary, output_path, round_csv=3)
         print(f"Exported lineup summary to {output_path}")
\ No newline at end of file
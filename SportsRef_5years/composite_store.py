@@ -0,0 +1,301 @@
+"""
+composite_store.py
+
+Incremental 5-year composites. calculate_weighted_averages (srs_5years / net_5years)
+recomputes every team's whole history from the combined frame, and adding a season means
+editing season_years and weights in both scripts. The store keeps per team, per season
+sufficient statistics instead:
+    count, sum / sum of squares / min / max of rank and SRS, sums of the inverted normalized
+    rank and normalized SRS (the composite's two halves), the conference code, and the raw
+    values themselves (a team has at most a few rows per season, so this is the exact
+    order-statistic sketch the medians need)
+Adding or replacing a season rewrites one column of those arrays (O(teams)); a composite for
+any window of seasons is a few reductions over the window's columns.
+
+srs_composite() / net_composite() give exactly the calculate_weighted_averages tables of
+srs_5years / net_5years for the same seasons and weights (up to float summation order).
+Default weights for an n-season window grow linearly, (i + 2) / sum -- for 5 seasons that is
+the hand-picked [0.10, 0.15, 0.20, 0.25, 0.30].
+
+Call:
+    from composite_store import CompositeStore
+    from season_panel import ingest, srs_frame
+
+    store = CompositeStore.from_frame(srs_frame(ingest()))
+    store.add_season("25_26", new_season_df)       # process_srs_data rows for the new season
+    table = store.srs_composite(window=5)          # last 5 seasons, default weights
+    store.save("srs_composite_store.npz")
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from conference_history import ConferenceHistory, MISSING
+
+SUMS = ["n", "rank_sum", "rank_sq", "srs_sum", "srs_sq", "inv_rank_sum", "nsrs_sum", "nrank_sum"]
+EXTREMES = ["rank_min", "rank_max", "srs_min", "srs_max"]
+VALUES = ["rank", "srs_score"]
+
+
+def default_weights(n):
+    """Linearly increasing season weights summing to 1 ([0.10, ..., 0.30] for n = 5)."""
+    w = np.arange(2, n + 2, dtype=float)
+    return w / w.sum()
+
+
+def _normalize(df):
+    """Per-season normalized_rank / normalized_srs exactly as process_srs_data builds them."""
+    df = df.copy()
+    if "normalized_rank" not in df.columns:
+        df["normalized_rank"] = (df["rank"] - 1) / (df["rank"].max() - 1) * 100
+    if "srs_score" in df.columns and "normalized_srs" not in df.columns:
+        s = df["srs_score"]
+        df["normalized_srs"] = (s - s.min()) / (s.max() - s.min()) * 100
+    return df
+
+
+class CompositeStore:
+    """Teams x seasons sufficient statistics (see module docstring); seasons are kept sorted."""
+
+    def __init__(self):
+        self.teams = []
+        self._index = {}
+        self.seasons = []
+        self.conferences = []
+        self.codes = np.zeros((0, 0), dtype=np.int16)
+        self.stats = {name: np.zeros((0, 0)) for name in SUMS + EXTREMES}
+        self.values = {name: np.zeros((0, 0, 1)) for name in VALUES}
+
+    @classmethod
+    def from_frame(cls, combined_df):
+        """Store built season by season from a combined (process_srs_data / net) frame."""
+        store = cls()
+        for season, df in combined_df.groupby(combined_df["season"].astype(str), sort=True):
+            store.add_season(season, df)
+        return store
+
+    # ---- growth ----
+    def _grow_teams(self, names):
+        new = [t for t in pd.unique(pd.Series(names, dtype=object)) if t not in self._index]
+        if not new:
+            return
+        for t in new:
+            self._index[t] = len(self.teams)
+            self.teams.append(t)
+        k = len(new)
+        self.codes = np.vstack([self.codes, np.full((k, len(self.seasons)), MISSING, dtype=np.int16)])
+        for name, arr in self.stats.items():
+            self.stats[name] = np.vstack([arr, np.full((k, len(self.seasons)), self._blank(name))])
+        for name, arr in self.values.items():
+            self.values[name] = np.concatenate([arr, np.full((k,) + arr.shape[1:], np.nan)], axis=0)
+
+    @staticmethod
+    def _blank(name):
+        return np.nan if name in EXTREMES else 0.0
+
+    def _season_column(self, season):
+        """Column of a season, inserting an empty one (in sorted position) if it is new."""
+        if season in self.seasons:
+            col = self.seasons.index(season)
+            self.codes[:, col] = MISSING
+            for name in self.stats:
+                self.stats[name][:, col] = self._blank(name)
+            for name in self.values:
+                self.values[name][:, col] = np.nan
+            return col
+        col = int(np.searchsorted(self.seasons, season))
+        self.seasons.insert(col, season)
+        self.codes = np.insert(self.codes, col, MISSING, axis=1)
+        for name in self.stats:
+            self.stats[name] = np.insert(self.stats[name], col, self._blank(name), axis=1)
+        for name in self.values:
+            self.values[name] = np.insert(self.values[name], col, np.nan, axis=1)
+        return col
+
+    def _conference_codes(self, names):
+        """Codes for conference names; conferences stay sorted so codes order like names."""
+        new = sorted(set(names) - set(self.conferences))
+        if new:
+            merged = sorted(self.conferences + new)
+            remap = np.array([merged.index(c) for c in self.conferences] + [MISSING], dtype=np.int16)
+            self.codes = remap[self.codes]  # MISSING (-1) picks the trailing MISSING
+            self.conferences = merged
+        lookup = {c: i for i, c in enumerate(self.conferences)}
+        return np.array([lookup[c] for c in names], dtype=np.int16)
+
+    # ---- updates ----
+    def add_season(self, season, df):
+        """
+        Add or replace one season from its rows (process_srs_data layout, or the NET layout
+        without conference / srs_score). Only this season's column changes.
+        """
+        season = str(season)
+        df = _normalize(df)
+        self._grow_teams(df["team"])
+        col = self._season_column(season)
+
+        t = np.array([self._index[name] for name in df["team"]], dtype=np.int64)
+        T = len(self.teams)
+        rank = df["rank"].to_numpy(dtype=float)
+        has_srs = "srs_score" in df.columns
+        srs = df["srs_score"].to_numpy(dtype=float) if has_srs else np.full(len(df), np.nan)
+        nsrs = df["normalized_srs"].to_numpy(dtype=float) if has_srs else np.zeros(len(df))
+        nrank = df["normalized_rank"].to_numpy(dtype=float)
+
+        s = self.stats
+        s["n"][:, col] = np.bincount(t, minlength=T)
+        s["rank_sum"][:, col] = np.bincount(t, weights=rank, minlength=T)
+        s["rank_sq"][:, col] = np.bincount(t, weights=rank ** 2, minlength=T)
+        s["srs_sum"][:, col] = np.bincount(t, weights=srs, minlength=T)
+        s["srs_sq"][:, col] = np.bincount(t, weights=srs ** 2, minlength=T)
+        s["inv_rank_sum"][:, col] = np.bincount(t, weights=100 - nrank, minlength=T)
+        s["nsrs_sum"][:, col] = np.bincount(t, weights=nsrs, minlength=T)
+        s["nrank_sum"][:, col] = np.bincount(t, weights=nrank, minlength=T)
+        for name, v, fn in (("rank_min", rank, np.fmin), ("rank_max", rank, np.fmax), ("srs_min", srs, np.fmin), ("srs_max", srs, np.fmax)):
+            column = np.full(T, np.nan)
+            fn.at(column, t, v)
+            s[name][:, col] = column
+
+        # raw values for the medians: k-th row of a team this season goes to depth k
+        depth = pd.Series(t).groupby(t).cumcount().to_numpy()
+        if depth.max(initial=0) + 1 > self.values["rank"].shape[2]:
+            extra = depth.max() + 1 - self.values["rank"].shape[2]
+            for name in self.values:
+                arr = self.values[name]
+                self.values[name] = np.concatenate([arr, np.full(arr.shape[:2] + (extra,), np.nan)], axis=2)
+        self.values["rank"][t, col, depth] = rank
+        self.values["srs_score"][t, col, depth] = srs
+
+        if "conference" in df.columns:
+            conf = df["conference"]
+            ok = conf.notna().to_numpy()
+            self.codes[t[ok], col] = self._conference_codes(list(conf[ok].astype(str)))
+
+    # ---- queries ----
+    def window(self, seasons=None, window=None):
+        """Season labels for a query: explicit seasons, the last `window` seasons, or all."""
+        if seasons is not None:
+            return [str(x) for x in seasons]
+        return self.seasons[-window:] if window else list(self.seasons)
+
+    def _window_stats(self, seasons):
+        cols = [self.seasons.index(x) for x in seasons]
+        n = self.stats["n"][:, cols]
+        present = n.sum(axis=1) > 0
+        # teams in alphabetical order, like groupby('team')
+        order = np.array(sorted(np.flatnonzero(present), key=lambda i: self.teams[i]), dtype=np.int64)
+        return cols, order
+
+    def _moments(self, prefix, cols, rows):
+        s = self.stats
+        n = s["n"][np.ix_(rows, cols)].sum(axis=1)
+        total = s[f"{prefix}_sum"][np.ix_(rows, cols)].sum(axis=1)
+        sq = s[f"{prefix}_sq"][np.ix_(rows, cols)].sum(axis=1)
+        mean = total / n
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(np.maximum(sq - n * mean ** 2, 0) / (n - 1))
+        std[n < 2] = np.nan
+        return n, mean, std
+
+    def _median(self, name, cols, rows):
+        v = self.values[name][rows][:, cols].reshape(len(rows), -1)
+        return np.nanmedian(v, axis=1)
+
+    def srs_composite(self, seasons=None, window=None, weights=None, blend=0.5):
+        """srs_5years.calculate_weighted_averages for a window of seasons, from the stored statistics."""
+        seasons = self.window(seasons, window)
+        w = default_weights(len(seasons)) if weights is None else np.asarray(weights, dtype=float)
+        cols, rows = self._window_stats(seasons)
+        def sub(name):
+            return self.stats[name][np.ix_(rows, cols)]
+
+        n, mean_rank, rank_std = self._moments("rank", cols, rows)
+        _, mean_srs, srs_std = self._moments("srs", cols, rows)
+        composite = ((sub("inv_rank_sum") * blend + sub("nsrs_sum") * (1 - blend)) * w).sum(axis=1)
+
+        history = ConferenceHistory(self.teams, self.seasons, self.conferences, self.codes)
+        index = pd.Index(np.asarray(self.teams, dtype=object)[rows], name="team")
+        team_stats = pd.DataFrame(
+            {
+                "composite_score": composite,
+                "mean_rank": mean_rank,
+                "median_rank": self._median("rank", cols, rows),
+                "best_rank": np.nanmin(sub("rank_min"), axis=1).astype(np.int64),
+                "worst_rank": np.nanmax(sub("rank_max"), axis=1).astype(np.int64),
+                "seasons_count": n.astype(np.int64),
+                "mean_srs": mean_srs,
+                "median_srs": self._median("srs_score", cols, rows),
+                "best_srs": np.nanmin(sub("srs_min"), axis=1),
+                "worst_srs": np.nanmax(sub("srs_max"), axis=1),
+                "most_common_conference": history.mode(seasons).iloc[rows].to_numpy(),
+                "current_conference": history.most_recent(seasons).iloc[rows].to_numpy(),
+                "mean_normalized_rank": sub("nrank_sum").sum(axis=1) / n,
+                "mean_normalized_srs": sub("nsrs_sum").sum(axis=1) / n,
+            },
+            index=index,
+        )
+        team_stats = team_stats.sort_values("composite_score", ascending=False)
+        team_stats["composite_rank"] = range(1, len(team_stats) + 1)
+        team_stats["rank_stability"] = pd.Series(rank_std, index=index)
+        team_stats["srs_stability"] = pd.Series(srs_std, index=index)
+        return team_stats
+
+    def net_composite(self, seasons=None, window=None):
+        """net_5years.calculate_weighted_averages for a window of seasons, from the stored statistics."""
+        seasons = self.window(seasons, window)
+        cols, rows = self._window_stats(seasons)
+        n, mean_rank, rank_std = self._moments("rank", cols, rows)
+        index = pd.Index(np.asarray(self.teams, dtype=object)[rows], name="team")
+        team_stats = pd.DataFrame(
+            {
+                "mean_rank": mean_rank,
+                "median_rank": self._median("rank", cols, rows),
+                "best_rank": np.nanmin(self.stats["rank_min"][np.ix_(rows, cols)], axis=1).astype(np.int64),
+                "worst_rank": np.nanmax(self.stats["rank_max"][np.ix_(rows, cols)], axis=1).astype(np.int64),
+                "seasons_count": n.astype(np.int64),
+                "rank_stddev": rank_std,
+                "mean_normalized_rank": self.stats["nrank_sum"][np.ix_(rows, cols)].sum(axis=1) / n,
+            },
+            index=index,
+        )
+        # same ordering / relabelling as net_5years
+        team_stats = team_stats.sort_values("median_rank", ascending=True)
+        team_stats["median_rank"] = range(1, len(team_stats) + 1)
+        team_stats["rank_stability"] = pd.Series(rank_std, index=index)
+        return team_stats.round(1)
+
+    # ---- persistence ----
+    def save(self, path):
+        arrays = {f"stat_{k}": v for k, v in self.stats.items()}
+        arrays.update({f"value_{k}": v for k, v in self.values.items()})
+        np.savez(
+            path,
+            teams=np.asarray(self.teams, dtype=str),
+            codes=self.codes,
+            meta=json.dumps({"seasons": self.seasons, "conferences": self.conferences}),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            store.teams = [str(t) for t in data["teams"]]
+            store.codes = data["codes"]
+            store.stats = {k: data[f"stat_{k}"] for k in SUMS + EXTREMES}
+            store.values = {k: data[f"value_{k}"] for k in VALUES}
+        store._index = {t: i for i, t in enumerate(store.teams)}
+        store.seasons = meta["seasons"]
+        store.conferences = meta["conferences"]
+        return store
+
+
+if __name__ == "__main__":
+    from season_panel import ingest, srs_frame
+
+    store = CompositeStore.from_frame(srs_frame(ingest()))
+    print(store.srs_composite().head(20).round(2))
+    print(store.srs_composite(window=3).head(10).round(2))
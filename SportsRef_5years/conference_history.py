@@ -0,0 +1,185 @@
+"""
+conference_history.py
+
+Season-aware conference membership: a teams x seasons table of categorical conference codes
+(int16, -1 = team has no row that season), so realignment is kept instead of flattened away --
+Oregon State / Washington State are Pac-12 through 23_24 and WCC in 24_25.
+
+- point lookups:      conference("Oregon State", "24_25") -> "WCC"; lookup(teams, seasons) for arrays
+- window summaries:   mode() / most_recent() over any season window, straight off the code matrix
+                      (code counts + argmax; no per-team Python call)
+- conference tables:  aggregate() groups any team-season values by the conference each team was
+                      in that season, for any season window, with bincount
+
+Conference codes follow sorted conference names, so ties in mode() go to the alphabetically
+first conference -- the same answer as pandas Series.mode()[0].
+
+Call:
+    from season_panel import ingest, srs_frame
+    from conference_history import ConferenceHistory
+
+    combined = srs_frame(ingest())
+    history = ConferenceHistory.from_frame(combined)
+    history.conference("Oregon State", "24_25")              # 'WCC'
+    history.mode()                                           # most common conference per team
+    history.most_recent()                                    # latest conference per team
+    history.aggregate(combined, ["srs_score"], seasons=["23_24", "24_25"], by_season=True)
+"""
+
+import numpy as np
+import pandas as pd
+
+from srs_5years import season_years
+
+MISSING = -1
+
+
+class ConferenceHistory:
+    """
+    teams, seasons, conferences: labels of the code matrix's rows / columns / code values.
+    codes: teams x seasons int array of conference codes (MISSING where a team has no season).
+    """
+
+    def __init__(self, teams, seasons, conferences, codes):
+        self.teams = pd.Index(teams)
+        self.seasons = pd.Index(seasons)
+        self.conferences = pd.Index(conferences)
+        self.codes = np.asarray(codes, dtype=np.int16)
+
+    @classmethod
+    def from_frame(cls, df, team_col="team", season_col="season", conf_col="conference", seasons=season_years):
+        """Build from any long team-season frame (srs_frame, the season panel, ...); the last row of a duplicate team-season wins."""
+        df = df[df[conf_col].notna()]
+        teams, team_idx = np.unique(df[team_col].astype(str).to_numpy(), return_inverse=True)
+        conferences, conf_idx = np.unique(df[conf_col].astype(str).to_numpy(), return_inverse=True)
+        seasons = pd.Index(list(seasons))
+        season_idx = seasons.get_indexer(df[season_col].astype(str))
+
+        codes = np.full((len(teams), len(seasons)), MISSING, dtype=np.int16)
+        keep = season_idx >= 0
+        codes[team_idx[keep], season_idx[keep]] = conf_idx[keep]
+        return cls(teams, seasons, conferences, codes)
+
+    # ---- lookups ----
+    def _window(self, seasons):
+        if seasons is None:
+            return np.arange(len(self.seasons))
+        idx = self.seasons.get_indexer([str(s) for s in seasons])
+        if (idx < 0).any():
+            raise ValueError(f"unknown seasons: {[s for s, i in zip(seasons, idx) if i < 0]}")
+        return idx
+
+    def _names(self, codes):
+        names = np.asarray(self.conferences, dtype=object)[np.maximum(codes, 0)]
+        return np.where(codes >= 0, names, None)
+
+    def conference(self, team, season):
+        """Conference of one team in one season, or None."""
+        return self.lookup([team], [season])[0]
+
+    def lookup(self, teams, seasons):
+        """Conference for each (team, season) pair (arrays of equal length); None where unknown."""
+        ti = self.teams.get_indexer(pd.Index(teams).astype(str))
+        si = self.seasons.get_indexer(pd.Index(seasons).astype(str))
+        ok = (ti >= 0) & (si >= 0)
+        codes = np.full(len(ti), MISSING, dtype=np.int16)
+        codes[ok] = self.codes[ti[ok], si[ok]]
+        return self._names(codes)
+
+    def members(self, conference, season):
+        """Teams in a conference in one season."""
+        code = self.conferences.get_loc(conference)
+        return list(self.teams[self.codes[:, self._window([season])[0]] == code])
+
+    # ---- per-team window summaries ----
+    def mode_codes(self, seasons=None):
+        """Most common conference code per team in the window (ties -> lowest code), MISSING if none."""
+        window = self.codes[:, self._window(seasons)]
+        n_conf = len(self.conferences)
+        rows = np.broadcast_to(np.arange(len(self.teams))[:, None], window.shape)
+        present = window >= 0
+        counts = np.bincount(rows[present] * n_conf + window[present], minlength=len(self.teams) * n_conf)
+        counts = counts.reshape(len(self.teams), n_conf)
+        return np.where(counts.any(axis=1), counts.argmax(axis=1), MISSING)
+
+    def most_recent_codes(self, seasons=None):
+        """Conference code of each team's latest season in the window, MISSING if none."""
+        window = self.codes[:, self._window(seasons)]
+        present = window >= 0
+        last = window.shape[1] - 1 - np.argmax(present[:, ::-1], axis=1)
+        return np.where(present.any(axis=1), window[np.arange(len(window)), last], MISSING)
+
+    def mode(self, seasons=None, default="Unknown"):
+        """Most common conference per team (pandas mode()[0] semantics)."""
+        return pd.Series(self._names(self.mode_codes(seasons)), index=self.teams, name="most_common_conference").fillna(default)
+
+    def most_recent(self, seasons=None, default="Unknown"):
+        """Conference each team played in most recently."""
+        return pd.Series(self._names(self.most_recent_codes(seasons)), index=self.teams, name="current_conference").fillna(default)
+
+    # ---- per-conference aggregation ----
+    def aggregate(self, df, value_cols, seasons=None, by_season=False, team_col="team", season_col="season"):
+        """
+        Team-season count plus count / mean / std of value_cols per conference over a season
+        window; every team-season row counts toward the conference the team was in that season.
+        by_season: one row per (conference, season) instead of per conference.
+        """
+        window = self._window(seasons)
+        in_window = np.zeros(len(self.seasons), dtype=bool)
+        in_window[window] = True
+
+        ti = self.teams.get_indexer(df[team_col].astype(str))
+        si = self.seasons.get_indexer(df[season_col].astype(str))
+        ok = (ti >= 0) & (si >= 0)
+        ok[ok] = in_window[si[ok]]
+        code = np.full(len(df), MISSING, dtype=np.int64)
+        code[ok] = self.codes[ti[ok], si[ok]]
+        ok &= code >= 0
+
+        n_conf = len(self.conferences)
+        if by_season:
+            group = si[ok] * n_conf + code[ok]
+            n_groups = len(self.seasons) * n_conf
+            index = pd.MultiIndex.from_product([self.seasons, self.conferences], names=["season", "conference"])
+        else:
+            group = code[ok]
+            n_groups = n_conf
+            index = pd.Index(self.conferences, name="conference")
+
+        out = {}
+        for col in value_cols:
+            v = df[col].to_numpy(dtype=float)[ok]
+            has = ~np.isnan(v)
+            n = np.bincount(group[has], minlength=n_groups)
+            s = np.bincount(group[has], weights=v[has], minlength=n_groups)
+            ss = np.bincount(group[has], weights=v[has] ** 2, minlength=n_groups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = s / n
+                var = (ss - n * mean ** 2) / (n - 1)
+            out[f"{col}_count"] = n
+            out[f"{col}_mean"] = mean
+            out[f"{col}_std"] = np.sqrt(np.maximum(var, 0))
+        result = pd.DataFrame(out, index=index)
+        result.insert(0, "teams", np.bincount(group, minlength=n_groups))
+        return result[result["teams"] > 0]
+
+    def to_frame(self):
+        """Long team / season / conference table (known team-seasons only)."""
+        ti, si = np.nonzero(self.codes >= 0)
+        return pd.DataFrame(
+            {
+                "team": self.teams[ti],
+                "season": pd.Categorical(self.seasons[si], categories=self.seasons, ordered=True),
+                "conference": pd.Categorical.from_codes(self.codes[ti, si], categories=self.conferences),
+            }
+        )
+
+
+if __name__ == "__main__":
+    from season_panel import ingest, srs_frame
+
+    combined = srs_frame(ingest())
+    history = ConferenceHistory.from_frame(combined)
+    for team in ["Oregon State", "Washington State", "Texas", "Gonzaga"]:
+        print(f"{team:18} mode={history.mode()[team]:8} current={history.most_recent()[team]}")
+    print(history.aggregate(combined, ["srs_score"], seasons=["24_25"]).sort_values("srs_score_mean", ascending=False).head(10).round(2))
@@ -0,0 +1,197 @@
+"""
+elo_ratings.py
+
+Game-by-game Elo across seasons, next to the SRS / NET composites.
+
+Games come from srs_solver.load_games (game_files/<season>.csv). They are processed one
+date at a time: every game on a date is rated from the ratings at the start of that date
+in a handful of array operations (team state is a ratings array indexed by team), so the
+Python loop runs once per game day, not once per game.
+
+- expected = 1 / (1 + 10 ** (-(r_team - r_opp + hca * site) / 400))
+- margin of victory: change *= ln(|margin| + 1) * 2.2 / (0.001 * winner's Elo edge + 2.2)
+- new season: every rating moves `regress` of the way back to the mean first
+
+The engine is persistent: save() / EloEngine.load() keep ratings, the last processed date
+and the per-season snapshots, so a new day's results cost O(new games). Games dated on or
+before the last processed date are ignored, so feed complete days.
+
+team_seasons() is the long (team, season, elo, games) panel; composite_frame() puts the
+season-end Elo in the process_srs_data layout (srs_score = Elo) for calculate_weighted_averages.
+
+Call:
+    from elo_ratings import EloEngine
+    from srs_solver import load_games
+
+    engine = EloEngine()
+    engine.update(load_games("game_files"))
+    engine.save("elo_state.npz")
+
+    engine = EloEngine.load("elo_state.npz")
+    engine.update(todays_games)                  # only the new dates are processed
+    panel = engine.team_seasons()
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class EloEngine:
+    """
+    k: base K-factor.  hca: home-court edge in Elo points.  regress: share of the distance to
+    the mean removed between seasons.  mov: scale changes by margin of victory.  init: rating
+    of a team's first appearance.
+    """
+
+    def __init__(self, k=20.0, hca=100.0, regress=1 / 3, mov=True, init=1500.0):
+        self.params = {"k": k, "hca": hca, "regress": regress, "mov": mov, "init": init}
+        self.teams = []
+        self._index = {}
+        self.ratings = np.zeros(0)
+        self.seasons = []
+        self.snapshots = np.zeros((0, 0))  # seasons x teams, rating after the team's last game that season
+        self.games = np.zeros((0, 0), dtype=np.int64)  # seasons x teams, games played
+        self.last_date = None
+
+    # ---- state ----
+    def _team_ids(self, names):
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        new = [u for u in uniques if u not in self._index]
+        if new:
+            for name in new:
+                self._index[name] = len(self.teams)
+                self.teams.append(name)
+            self.ratings = np.r_[self.ratings, np.full(len(new), self.params["init"])]
+            pad = np.full((len(self.seasons), len(new)), np.nan)
+            self.snapshots = np.concatenate([self.snapshots, pad], axis=1)
+            self.games = np.concatenate([self.games, np.zeros_like(pad, dtype=np.int64)], axis=1)
+        lookup = np.array([self._index[u] for u in uniques], dtype=np.int64)
+        return lookup[codes]
+
+    def _start_season(self, season):
+        if self.seasons:
+            mean = self.params["init"]
+            self.ratings = mean + (1 - self.params["regress"]) * (self.ratings - mean)
+        self.seasons.append(season)
+        self.snapshots = np.vstack([self.snapshots, np.full((1, len(self.teams)), np.nan)])
+        self.games = np.vstack([self.games, np.zeros((1, len(self.teams)), dtype=np.int64)])
+
+    # ---- rating ----
+    def _rate_day(self, team, opp, site, margin):
+        p = self.params
+        r = self.ratings
+        edge = r[team] - r[opp] + p["hca"] * site
+        expected = 1 / (1 + 10 ** (-edge / 400))
+        result = np.where(margin > 0, 1.0, np.where(margin < 0, 0.0, 0.5))
+        change = p["k"] * (result - expected)
+        if p["mov"]:
+            winner_edge = np.where(margin >= 0, edge, -edge)
+            change *= np.log(np.abs(margin) + 1) * 2.2 / (0.001 * winner_edge + 2.2)
+        delta = np.zeros(len(r))
+        np.add.at(delta, team, change)
+        np.add.at(delta, opp, -change)
+        self.ratings = r + delta
+
+    def update(self, games):
+        """
+        Rate every game dated after the last processed date (season, date, team, opponent,
+        site, margin as from srs_solver.load_games). Returns the number of games rated.
+        """
+        games = games if self.last_date is None else games[games["date"] > self.last_date]
+        if games.empty:
+            return 0
+        games = games.assign(season=games["season"].astype(str)).sort_values(["season", "date"], kind="stable")
+        team = self._team_ids(games["team"])
+        opp = self._team_ids(games["opponent"])
+        site = games["site"].to_numpy(dtype=float)
+        margin = games["margin"].to_numpy(dtype=float)
+        season = games["season"].to_numpy()
+        dates = games["date"].to_numpy()
+
+        starts = np.flatnonzero(np.r_[True, (dates[1:] != dates[:-1]) | (season[1:] != season[:-1])])
+        ends = np.r_[starts[1:], len(games)]
+        for a, b in zip(starts, ends):
+            if not self.seasons or season[a] != self.seasons[-1]:
+                self._start_season(season[a])
+            t, o = team[a:b], opp[a:b]
+            self._rate_day(t, o, site[a:b], margin[a:b])
+            played = np.r_[t, o]
+            self.snapshots[-1, played] = self.ratings[played]
+            np.add.at(self.games[-1], played, 1)
+        self.last_date = pd.Timestamp(dates[-1])
+        return len(games)
+
+    # ---- output ----
+    def current(self):
+        """Current rating of every team, best first."""
+        return pd.Series(self.ratings, index=pd.Index(self.teams, name="team"), name="elo").sort_values(ascending=False)
+
+    def team_seasons(self):
+        """Long team-season panel: season-end Elo and games played."""
+        s, t = np.nonzero(self.games > 0)
+        return pd.DataFrame(
+            {
+                "team": np.asarray(self.teams, dtype=object)[t],
+                "season": pd.Categorical(np.asarray(self.seasons, dtype=object)[s], categories=self.seasons, ordered=True),
+                "elo": self.snapshots[s, t],
+                "games": self.games[s, t],
+            }
+        ).sort_values(["season", "elo"], ascending=[True, False]).reset_index(drop=True)
+
+    def composite_frame(self, history=None):
+        """process_srs_data layout with the season-end Elo as srs_score (conference from a ConferenceHistory)."""
+        out = self.team_seasons().rename(columns={"elo": "srs_score"})
+        out["rank"] = out.groupby("season", observed=True).cumcount().astype(np.int64) + 1
+        if history is not None:
+            out["conference"] = pd.Series(history.lookup(out["team"], out["season"].astype(str))).fillna("Unknown").to_numpy()
+        else:
+            out["conference"] = "Unknown"
+        out = out[["team", "conference", "rank", "srs_score", "season"]]
+        out["normalized_rank"] = out.groupby("season", observed=True)["rank"].transform(
+            lambda x: (x - 1) / (x.max() - 1) * 100
+        )
+        out["normalized_srs"] = out.groupby("season", observed=True)["srs_score"].transform(
+            lambda x: (x - x.min()) / (x.max() - x.min()) * 100
+        )
+        return out
+
+    # ---- persistence ----
+    def save(self, path):
+        np.savez(
+            path,
+            teams=np.asarray(self.teams, dtype=str),
+            ratings=self.ratings,
+            seasons=np.asarray(self.seasons, dtype=str),
+            snapshots=self.snapshots,
+            games=self.games,
+            meta=json.dumps({"params": self.params, "last_date": None if self.last_date is None else self.last_date.isoformat()}),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            engine = cls(**meta["params"])
+            engine.teams = [str(t) for t in data["teams"]]
+            engine._index = {t: i for i, t in enumerate(engine.teams)}
+            engine.ratings = data["ratings"]
+            engine.seasons = [str(s) for s in data["seasons"]]
+            engine.snapshots = data["snapshots"]
+            engine.games = data["games"]
+        engine.last_date = None if meta["last_date"] is None else pd.Timestamp(meta["last_date"])
+        return engine
+
+
+if __name__ == "__main__":
+    import time
+
+    from srs_solver import load_games
+
+    games = load_games("game_files")
+    start = time.perf_counter()
+    engine = EloEngine()
+    n = engine.update(games)
+    print(f"{n} games in {time.perf_counter() - start:.2f}s")
+    print(engine.current().head(20).round(1))
@@ -88,12 +88,15 @@ def calculate_weighted_averages(combined_df, weights):
     team_stats = team_stats.round(1)
     return team_stats
 
-# Process the data
-combined_data = process_srs_data(file_path)
-weighted_averages = calculate_weighted_averages(combined_data, weights)
+if __name__ == "__main__":
+    from season_panel import ingest, net_frame
 
-# Save results
-weighted_averages.to_csv('conf_net_0910.csv')
+    # Process the data (season files are parsed once into season_panel; only changed files re-read)
+    combined_data = net_frame(ingest())
+    weighted_averages = calculate_weighted_averages(combined_data, weights)
 
-# Display top 20 teams
-print(weighted_averages.head(20).round(2))
+    # Save results
+    weighted_averages.to_csv('conf_net_0910.csv')
+
+    # Display top 20 teams
+    print(weighted_averages.head(20).round(2))
\ No newline at end of file
@@ -1,7 +1,19 @@
 import pandas as pd
 
-df_net = pd.read_csv("composite_net_rankings.csv")
-df_srs = pd.read_csv("composite_srs_rankings.csv")
+import net_5years
+import srs_5years
+from season_panel import ingest, net_frame, srs_frame
+
+# Composites straight from the season panel (no round trip through the composite CSVs).
+# NET and SRS spell schools differently ("LMU (CA)" / "Loyola Marymount", "IUPUI" / "IU Indy"),
+# so both are put on the panel's canonical team before averaging and joining.
+panel = ingest()
+net = net_frame(panel)
+srs = srs_frame(panel)
+net['team'] = net['team'].map(dict(zip(panel['net_name'], panel['team']))).fillna(net['team'])
+srs['team'] = srs['team'].map(dict(zip(panel['srs_name'], panel['team']))).fillna(srs['team'])
+df_net = net_5years.calculate_weighted_averages(net, net_5years.weights).reset_index()
+df_srs = srs_5years.calculate_weighted_averages(srs, srs_5years.weights).reset_index()
 
 print("="*30)
 print('-'*10,'Analysis of Net vs SRS Rankings','-'*10)
@@ -0,0 +1,225 @@
+"""
+season_panel.py
+
+One ingest step for the season files in srs_files/ and net_files/, replacing the
+read / drop Unnamed / lowercase / rename / strip dance that srs_5years.py and net_5years.py
+each repeat on every run.
+
+Every season file is normalized into a single typed team-season panel:
+    team_id (int), team (canonical, see team_resolver.py), season, conference,
+    srs_rank, srs_score, net_rank, srs_name, net_name
+stored columnar (season_panel.parquet; pickle without pyarrow). A manifest of file digests
+sits next to it, and ingest() only re-parses season files whose bytes changed -- unchanged
+seasons are reused from the stored panel.
+
+srs_frame / net_frame give back the exact frames process_srs_data returns in srs_5years.py /
+net_5years.py (normalized_rank, normalized_srs included), so the composite code can run off
+the panel.
+
+Call:
+    from season_panel import ingest, load_panel, srs_frame
+
+    panel = ingest()                 # re-reads only changed season files
+    panel = load_panel()             # milliseconds
+    combined = srs_frame(panel)      # == srs_5years.process_srs_data("srs_files")
+"""
+
+import hashlib
+import json
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from srs_5years import season_years
+from team_resolver import TeamResolver
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PANEL_PATH = os.path.join(HERE, "season_panel.parquet")
+
+# source -> (folder, team column, {raw column: panel column})
+SOURCES = {
+    "srs": ("srs_files", "School", {"Rk": "srs_rank", "Conf": "conference", "SRS": "srs_score"}),
+    "net": ("net_files", "Team", {"NET Rank": "net_rank"}),
+}
+PANEL_COLS = ["team_id", "team", "season", "conference", "srs_rank", "srs_score", "net_rank", "srs_name", "net_name"]
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _storage_path(panel_path):
+    return panel_path if _has_pyarrow() else os.path.splitext(panel_path)[0] + ".pkl"
+
+
+def _manifest_path(panel_path):
+    return os.path.splitext(panel_path)[0] + ".manifest.json"
+
+
+def _read_season(path, source, resolver):
+    """One season file -> (team_id, season, <source columns>, <source>_name)."""
+    _, team_col, cols = SOURCES[source]
+    df = pd.read_csv(path)
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    raw_names = df[team_col].astype(str).str.strip()
+    out = df[list(cols)].rename(columns=cols)
+    out[f"{source}_name"] = raw_names
+    out["team"] = resolver.resolve_column(raw_names)
+    out["season"] = os.path.splitext(os.path.basename(path))[0]
+    return out
+
+
+def _drop_duplicate_keys(df, source):
+    """Keep the first row per resolved (team, season); warn about the ones dropped (two names -> one team)."""
+    dup = df["team"].notna() & df.duplicated(["team", "season"], keep="first")
+    if dup.any():
+        cols = [f"{source}_name", "team", "season"]
+        warnings.warn(
+            f"{source}: dropped rows resolving to an existing (team, season):\n{df.loc[dup, cols].to_string(index=False)}",
+            stacklevel=3,
+        )
+    return df[~dup]
+
+
+def _typed(panel):
+    panel = panel.copy()
+    panel["season"] = pd.Categorical(panel["season"].astype(str), categories=season_years, ordered=True)
+    panel["conference"] = panel["conference"].astype("category")
+    panel["team"] = panel["team"].astype("string")
+    for col in ("srs_name", "net_name"):
+        panel[col] = panel[col].astype("string")
+    for col in ("srs_rank", "net_rank", "team_id"):
+        panel[col] = pd.to_numeric(panel[col], errors="coerce").astype("Int64")
+    panel["srs_score"] = panel["srs_score"].astype(float)
+    return panel[PANEL_COLS].sort_values(["season", "team_id"]).reset_index(drop=True)
+
+
+def load_panel(panel_path=PANEL_PATH):
+    """The stored panel (no CSV parsing)."""
+    path = _storage_path(panel_path)
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_pickle(path)
+
+
+def ingest(panel_path=PANEL_PATH, resolver=None, force=False, base_dir=HERE):
+    """
+    Build / refresh the team-season panel. Only season files whose digest changed since the
+    last ingest are parsed; every other (source, season) block is taken from the stored panel.
+    base_dir: folder holding srs_files/ and net_files/.
+    """
+    path = _storage_path(panel_path)
+    manifest_path = _manifest_path(panel_path)
+    manifest, stored = {}, None
+    if not force and os.path.exists(path) and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        stored = load_panel(panel_path)
+
+    files = {}
+    for source, (folder, _, _) in SOURCES.items():
+        folder_path = os.path.join(base_dir, folder)
+        for name in sorted(os.listdir(folder_path)):
+            season = os.path.splitext(name)[0]
+            if name.endswith(".csv") and season in season_years:
+                files[f"{source}/{season}"] = os.path.join(folder_path, name)
+
+    digests = {key: _digest(p) for key, p in files.items()}
+    if stored is not None and digests == manifest:
+        return stored
+
+    parts = {source: [] for source in SOURCES}
+    for key, p in files.items():
+        source, season = key.split("/")
+        cols = list(SOURCES[source][2].values()) + [f"{source}_name", "team"]
+        if stored is not None and manifest.get(key) == digests[key]:
+            block = stored.loc[stored["season"].astype(str) == season, cols + ["season"]]
+            parts[source].append(block.dropna(subset=[f"{source}_name"]).astype({"season": str, "team": object}))
+            continue
+        if resolver is None:
+            resolver = TeamResolver.default()
+        parts[source].append(_read_season(p, source, resolver))
+
+    srs = _drop_duplicate_keys(pd.concat(parts["srs"], ignore_index=True), "srs")
+    net = _drop_duplicate_keys(pd.concat(parts["net"], ignore_index=True), "net")
+    # unresolved names (team NA) stay as their own rows instead of matching each other on NA
+    srs_ok, net_ok = srs["team"].notna(), net["team"].notna()
+    panel = pd.concat(
+        [
+            srs[srs_ok].merge(net[net_ok], on=["team", "season"], how="outer", validate="one_to_one"),
+            srs[~srs_ok],
+            net[~net_ok],
+        ],
+        ignore_index=True,
+    )
+
+    if resolver is None:
+        resolver = TeamResolver.default()
+    panel["team_id"] = resolver.resolve_column(panel["team"], to="id")
+    panel = _typed(panel)
+
+    if path.endswith(".parquet"):
+        panel.to_parquet(path, index=False)
+    else:
+        panel.to_pickle(path)
+    with open(manifest_path, "w") as f:
+        json.dump(digests, f, indent=2, sort_keys=True)
+    return panel
+
+
+def _normalized_rank(df):
+    return df.groupby("season", observed=True)["rank"].transform(lambda x: (x - 1) / (x.max() - 1) * 100)
+
+
+def srs_frame(panel):
+    """srs_5years.process_srs_data layout from the panel (SRS team names, one row per SRS team-season)."""
+    df = panel[panel["srs_name"].notna()]
+    out = pd.DataFrame(
+        {
+            "team": df["srs_name"].astype(str),
+            "conference": df["conference"].astype(str),
+            "rank": df["srs_rank"].astype(np.int64),
+            "srs_score": df["srs_score"],
+            "season": pd.Categorical(df["season"].astype(str), categories=season_years, ordered=True),
+        }
+    ).reset_index(drop=True)
+    out["normalized_rank"] = _normalized_rank(out)
+    out["normalized_srs"] = out.groupby("season", observed=True)["srs_score"].transform(
+        lambda x: (x - x.min()) / (x.max() - x.min()) * 100
+    )
+    return out
+
+
+def net_frame(panel):
+    """net_5years.process_srs_data layout from the panel (NET team names, one row per NET team-season)."""
+    df = panel[panel["net_name"].notna()]
+    out = pd.DataFrame(
+        {
+            "team": df["net_name"].astype(str),
+            "rank": df["net_rank"].astype(np.int64),
+            "season": pd.Categorical(df["season"].astype(str), categories=season_years, ordered=True),
+        }
+    ).reset_index(drop=True)
+    out["normalized_rank"] = _normalized_rank(out)
+    return out
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    panel = ingest()
+    print(f"ingest: {time.perf_counter() - start:.3f}s, {len(panel)} team-seasons")
+    start = time.perf_counter()
+    panel = load_panel()
+    print(f"load:   {time.perf_counter() - start:.3f}s")
+    print(panel.head(10))
@@ -53,6 +53,8 @@ def process_srs_data(file_path):
     return combined
 
 def calculate_weighted_averages(combined_df, weights):
+    from conference_history import ConferenceHistory
+
     # Create a weight mapping
     weight_map = {season: weight for season, weight in zip(season_years, weights)}
     # Ensure we're working with numeric types
@@ -74,7 +76,6 @@ def calculate_weighted_averages(combined_df, weights):
         'weighted_composite': 'sum',
         'rank': ['mean', 'median', 'min', 'max', 'count'],
         'srs_score': ['mean', 'median', 'min', 'max'],
-        'conference': lambda x: x.mode()[0] if len(x.mode()) > 0 else 'Unknown',
         'normalized_rank': 'mean',
         'normalized_srs': 'mean'
     })
@@ -94,11 +95,17 @@ def calculate_weighted_averages(combined_df, weights):
         'srs_score_median': 'median_srs',
         'srs_score_min': 'best_srs',
         'srs_score_max': 'worst_srs',
-        'conference_<lambda>': 'most_common_conference',
         'normalized_rank_mean': 'mean_normalized_rank',
         'normalized_srs_mean': 'mean_normalized_srs'
     })
     
+    # Conference per team from the season-aware history: most common, plus the latest one
+    # (realigned teams like Oregon State are Pac-12 by count but WCC now)
+    history = ConferenceHistory.from_frame(combined_df)
+    loc = team_stats.columns.get_loc('worst_srs') + 1
+    team_stats.insert(loc, 'most_common_conference', history.mode().reindex(team_stats.index, fill_value='Unknown'))
+    team_stats.insert(loc + 1, 'current_conference', history.most_recent().reindex(team_stats.index, fill_value='Unknown'))
+
     # Sort by composite score (higher is better)
     team_stats = team_stats.sort_values('composite_score', ascending=False)
     
@@ -112,12 +119,15 @@ def calculate_weighted_averages(combined_df, weights):
     
     return team_stats
 
-# Process the data
-combined_data = process_srs_data(file_path)
-weighted_averages = calculate_weighted_averages(combined_data, weights)
+if __name__ == "__main__":
+    from season_panel import ingest, srs_frame
+
+    # Process the data (season files are parsed once into season_panel; only changed files re-read)
+    combined_data = srs_frame(ingest())
+    weighted_averages = calculate_weighted_averages(combined_data, weights)
 
-# Save results
-weighted_averages.to_csv('composite_srs_rankings.csv')
+    # Save results
+    weighted_averages.to_csv('composite_srs_rankings.csv')
 
-# Display top 20 teams
-print(weighted_averages.head(20).round(2))
+    # Display top 20 teams
+    print(weighted_averages.head(20).round(2))
@@ -1,13 +1,16 @@
 import pandas as pd
 from collections import defaultdict
 
-# Load data
-srs_teams = set(pd.read_csv('composite_srs_rankings.csv')['team'])
-net_teams = set(pd.read_csv('composite_net_rankings.csv')['team'])
-current_data = pd.read_csv('srs_files/24_25.csv')
+from season_panel import ingest
+
+# Load data (team names as spelled in each source, from the season panel)
+panel = ingest()
+srs_teams = set(panel['srs_name'].dropna())
+net_teams = set(panel['net_name'].dropna())
+current_data = panel[(panel['season'] == '24_25') & panel['srs_name'].notna()]
 
 # Create conference lookup
-conf_lookup = dict(zip(current_data['School'], current_data['Conf']))
+conf_lookup = dict(zip(current_data['srs_name'], current_data['conference'].astype(str)))
 
 # Step 1: Group name variations
 name_groups = defaultdict(list)
@@ -0,0 +1,240 @@
+"""
+srs_solver.py
+
+SRS computed locally from game results, so ratings exist for any window of games
+(conference games only, the last 30 days, ...) instead of only for the downloaded
+srs_files/<season>.csv tables.
+
+Game files live in game_files/<season>.csv, one row per game from one team's side:
+    date, team, opponent, site (H / A / N, "@" = A), and margin or team_score + opp_score
+A game listed from both sides (schedule exports) is kept once.
+
+Model, per season: margin = rating[team] - rating[opponent] + hca * site (+1 home, -1 away,
+0 neutral), with ratings summing to 0, solved by weighted least squares. Each game touches
+three unknowns, so the normal equations are assembled straight from the game list with one
+bincount over (season, row, col) cells, and every season is solved in one batched
+np.linalg.solve. Ratings are only relative within a connected group of teams (conference-only
+or short windows split a season into islands), so each season's game graph is split into
+connected components and every component gets its own sum-to-zero constraint, added as an
+m m^T term over its teams (m^T b = 0, so it pins that component's free shift without moving
+the fit).
+Dense rather than sparse least squares: the normal matrix is (teams + 1)^2 per season (~365^2),
+small enough that one batched dense solve over all seasons beats a sparse solver, and needs
+no scipy.
+Options: home-court term on/off, margin cap, exponential recency weights (half-life in days).
+
+Output has the process_srs_data layout (team, conference, rank, srs_score, season,
+normalized_rank, normalized_srs), so calculate_weighted_averages / weight_sweep run on it.
+
+Call:
+    from srs_solver import load_games, select_games, srs_from_games
+
+    games = load_games("game_files")
+    combined = srs_from_games(games, margin_cap=25, half_life=45)
+    recent = srs_from_games(select_games(games, last_days=30))
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from srs_5years import season_years
+
+SITE_CODES = {"H": 1, "A": -1, "@": -1, "N": 0}
+GAME_COLS = ["season", "date", "team", "opponent", "site", "margin"]
+
+
+def _read_games(path, season):
+    df = pd.read_csv(path)
+    df = df.loc[:, ~df.columns.str.contains("^Unnamed")]
+    df.columns = df.columns.str.lower()
+    if "margin" not in df.columns:
+        df["margin"] = df["team_score"] - df["opp_score"]
+    df["team"] = df["team"].astype(str).str.strip()
+    df["opponent"] = df["opponent"].astype(str).str.strip()
+    df["site"] = df["site"].fillna("N").astype(str).str.strip().str.upper().map(SITE_CODES)
+    if df["site"].isna().any():
+        raise ValueError(f"{path}: site must be one of {sorted(SITE_CODES)}")
+    df["date"] = pd.to_datetime(df["date"])
+    df["season"] = season
+    return df[GAME_COLS]
+
+
+def load_games(folder="game_files", seasons=season_years, resolver=None):
+    """
+    All season game files as one frame (season, date, team, opponent, site, margin).
+    resolver: a team_resolver.TeamResolver to put every name on the SRS school spelling;
+      None keeps names as written.
+    Games listed from both teams' sides are kept once.
+    """
+    frames = []
+    for season in seasons:
+        path = os.path.join(folder, f"{season}.csv")
+        if os.path.exists(path):
+            frames.append(_read_games(path, season))
+    games = pd.concat(frames, ignore_index=True)
+    if resolver is not None:
+        games["team"] = resolver.resolve_column(games["team"]).fillna(games["team"])
+        games["opponent"] = resolver.resolve_column(games["opponent"]).fillna(games["opponent"])
+
+    # one key per game regardless of which side wrote it
+    flip = games["team"] > games["opponent"]
+    first = games["team"].where(~flip, games["opponent"])
+    second = games["opponent"].where(~flip, games["team"])
+    games = games[~pd.DataFrame({"s": games["season"], "d": games["date"], "a": first, "b": second}).duplicated()]
+    games["season"] = pd.Categorical(games["season"], categories=list(seasons), ordered=True)
+    return games.sort_values(["season", "date"]).reset_index(drop=True)
+
+
+def select_games(games, start=None, end=None, last_days=None, teams=None, conference_only=False, history=None):
+    """
+    Subset of games for a custom window.
+    last_days: games within N days of each season's last game.
+    teams: keep only games between teams in this set (e.g. D1 only).
+    conference_only: both teams in the same conference that season (needs a ConferenceHistory).
+    """
+    keep = np.ones(len(games), dtype=bool)
+    if start is not None:
+        keep &= games["date"] >= pd.Timestamp(start)
+    if end is not None:
+        keep &= games["date"] <= pd.Timestamp(end)
+    if last_days is not None:
+        last = games.groupby("season", observed=True)["date"].transform("max")
+        keep &= games["date"] > last - pd.Timedelta(days=last_days)
+    if teams is not None:
+        teams = set(teams)
+        keep &= games["team"].isin(teams) & games["opponent"].isin(teams)
+    if conference_only:
+        if history is None:
+            raise ValueError("conference_only needs a conference_history.ConferenceHistory")
+        season = games["season"].astype(str)
+        conf_a = history.lookup(games["team"], season)
+        conf_b = history.lookup(games["opponent"], season)
+        keep &= (conf_a == conf_b) & pd.notna(conf_a)
+    return games[keep].reset_index(drop=True)
+
+
+def game_weights(games, half_life=None):
+    """1 per game, or 0.5 ** (days before the season's last game / half_life)."""
+    if half_life is None:
+        return np.ones(len(games))
+    last = games.groupby("season", observed=True)["date"].transform("max")
+    age = (last - games["date"]).dt.days.to_numpy(dtype=float)
+    return 0.5 ** (age / half_life)
+
+
+def _components(season_idx, team_idx, opp_idx, n_seasons, n_teams):
+    """Connected-component label per (season, team): the smallest team index reachable that season."""
+    labels = np.tile(np.arange(n_teams), (n_seasons, 1))
+    flat = labels.reshape(-1)
+    a = season_idx.astype(np.int64) * n_teams + team_idx
+    b = season_idx.astype(np.int64) * n_teams + opp_idx
+    while True:
+        low = np.minimum(flat[a], flat[b])
+        before = flat.copy()
+        np.minimum.at(flat, a, low)
+        np.minimum.at(flat, b, low)
+        flat[:] = flat[flat + np.repeat(np.arange(n_seasons) * n_teams, n_teams)]  # jump to the label's own label
+        if np.array_equal(flat, before):
+            return labels
+
+
+def solve_ratings(season_idx, team_idx, opp_idx, site, margin, weight, n_seasons, n_teams, hca=True):
+    """
+    Batched weighted least squares for every season at once.
+    Ratings sum to 0 within each connected group of teams in a season.
+    Returns (ratings: n_seasons x n_teams, NaN for teams without a game; hca: per season, 0 if off).
+    """
+    n = n_teams + 1  # last unknown is the home-court term
+    H = n_teams
+    h = site.astype(float) if hca else np.zeros(len(site))
+    w = weight.astype(float)
+    base = season_idx.astype(np.int64) * n * n
+
+    # A row per game: +1 team, -1 opponent, h home-court -> its w * a a^T entries
+    i, j, k = team_idx, opp_idx, np.full(len(team_idx), H)
+    rows = np.concatenate([i, j, i, j, i, k, j, k, k])
+    cols = np.concatenate([i, j, j, i, k, i, k, j, k])
+    vals = np.concatenate([w, w, -w, -w, w * h, w * h, -w * h, -w * h, w * h * h])
+    normal = np.bincount(np.tile(base, 9) + rows * n + cols, weights=vals, minlength=n_seasons * n * n)
+    normal = normal.reshape(n_seasons, n, n)
+
+    rhs_rows = np.concatenate([i, j, k])
+    rhs_vals = np.concatenate([w * margin, -w * margin, w * h * margin])
+    rhs = np.bincount(np.tile(season_idx.astype(np.int64) * n, 3) + rhs_rows, weights=rhs_vals, minlength=n_seasons * n)
+    rhs = rhs.reshape(n_seasons, n)
+
+    played = np.zeros((n_seasons, n_teams), dtype=bool)
+    played[season_idx, team_idx] = True
+    played[season_idx, opp_idx] = True
+    labels = _components(season_idx, team_idx, opp_idx, n_seasons, n_teams)
+    same = (labels[:, :, None] == labels[:, None, :]) & played[:, :, None] & played[:, None, :]
+    normal[:, :H, :H] += same  # sum of ratings = 0 within each connected group of teams
+    idle = np.concatenate([~played, normal[:, H, H:] == 0], axis=1)  # home court idle if off / all neutral
+    normal[:, np.arange(n), np.arange(n)] += idle  # unknowns with no equations solve to 0
+
+    try:
+        x = np.linalg.solve(normal, rhs[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        # home court not identified apart from the island shifts (e.g. only home-and-away pairs)
+        x = np.stack([np.linalg.lstsq(normal[s], rhs[s], rcond=None)[0] for s in range(n_seasons)])
+    ratings = np.where(played, x[:, :n_teams], np.nan)
+    return ratings, x[:, H]
+
+
+def srs_from_games(games, hca=True, margin_cap=None, half_life=None, history=None):
+    """
+    SRS per team-season in the process_srs_data layout.
+    margin_cap: clip margins to +/- cap before solving.
+    half_life: recency weights (days) within each season; None = all games equal.
+    history: ConferenceHistory for the conference column ("Unknown" without one).
+    The fitted home-court advantage per season is in .attrs["hca"].
+    """
+    seasons = list(games["season"].cat.categories) if hasattr(games["season"], "cat") else sorted(games["season"].unique())
+    season_idx = pd.Index(seasons).get_indexer(games["season"].astype(str))
+    teams, codes = np.unique(np.concatenate([games["team"].to_numpy(str), games["opponent"].to_numpy(str)]), return_inverse=True)
+    team_idx, opp_idx = codes[: len(games)], codes[len(games):]
+
+    margin = games["margin"].to_numpy(dtype=float)
+    if margin_cap is not None:
+        margin = np.clip(margin, -margin_cap, margin_cap)
+    ratings, home = solve_ratings(
+        season_idx, team_idx, opp_idx, games["site"].to_numpy(), margin, game_weights(games, half_life),
+        len(seasons), len(teams), hca=hca,
+    )
+
+    s, t = np.nonzero(~np.isnan(ratings))
+    out = pd.DataFrame({"team": teams[t], "srs_score": ratings[s, t], "season": np.asarray(seasons, dtype=object)[s]})
+    if history is not None:
+        out["conference"] = pd.Series(history.lookup(out["team"], out["season"])).fillna("Unknown").to_numpy()
+    else:
+        out["conference"] = "Unknown"
+    out = out.sort_values(["season", "srs_score"], ascending=[True, False], kind="stable")
+    out["rank"] = out.groupby("season").cumcount().astype(np.int64) + 1
+    out = out[["team", "conference", "rank", "srs_score", "season"]].reset_index(drop=True)
+
+    out["season"] = pd.Categorical(out["season"], categories=seasons, ordered=True)
+    out["normalized_rank"] = out.groupby("season", observed=True)["rank"].transform(
+        lambda x: (x - 1) / (x.max() - 1) * 100
+    )
+    out["normalized_srs"] = out.groupby("season", observed=True)["srs_score"].transform(
+        lambda x: (x - x.min()) / (x.max() - x.min()) * 100
+    )
+    out.attrs["hca"] = dict(zip(seasons, home))
+    return out
+
+
+if __name__ == "__main__":
+    import time
+
+    from conference_history import ConferenceHistory
+    from season_panel import ingest, srs_frame
+    from team_resolver import TeamResolver
+
+    games = load_games("game_files", resolver=TeamResolver.default())
+    start = time.perf_counter()
+    combined = srs_from_games(games, margin_cap=25, history=ConferenceHistory.from_frame(srs_frame(ingest())))
+    print(f"{len(games)} games -> {len(combined)} team-seasons in {time.perf_counter() - start:.3f}s")
+    print("home court:", {k: round(v, 2) for k, v in combined.attrs["hca"].items()})
+    print(combined.head(20).round(2))
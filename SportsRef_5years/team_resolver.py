@@ -0,0 +1,325 @@
+"""
+team_resolver.py
+
+One place to turn any team-name variant into a canonical team (Sports-Reference school
+name) and a stable integer team ID:
+    "LMU (CA)", "Loyola-Marymount", "LMU", "Loyola Marymount Lions"  ->  Loyola Marymount
+
+Built once from every mapping in the repo:
+- ALIASES below (SRS school name -> NET / common spellings seen in srs_files vs net_files)
+- team_normalization.json and srs_net_mapping.py's manual_groups
+- team_name_map in Big Defense 0616/preprocess.py (variant <-> "School Mascot" names)
+- teams_list in WCC_ranks.py (Synergy "School Mascot" names)
+- team_name_mapping.json keys, as variants only: its values came from an unchecked fuzzy
+  match (e.g. "Kansas State" -> "Arkansas State"), so they are never trusted
+
+Lookup order for a name:
+1. exact hash lookup on a normalized key (case, punctuation, St./State, Saint, &)
+2. mascot stripping: drop a trailing known mascot ("Gonzaga Bulldogs" -> "gonzaga"). Mascots
+   are learned from the "School Mascot" lists below, so "Wisconsin-Green Bay" never turns
+   into "wisconsin"
+3. fuzzy: character-trigram inverted index; only teams sharing a trigram with the query are
+   scored (Dice coefficient), so cost scales with the matching postings, not with all teams
+   (a key that is the query's leading words is skipped: school + non-mascot words is another team)
+Every distinct input string is resolved once and memoized; resolve_column factorizes a
+column and resolves each unique value once.
+
+Script parsing uses ast, so the source scripts (which read data files at import) are never run.
+
+Call:
+    from team_resolver import TeamResolver
+
+    resolver = TeamResolver.default()
+    resolver.resolve("LMU (CA)")                 # 'Loyola Marymount'
+    resolver.team_id("Loyola Marymount Lions")   # int
+    df["team_id"] = resolver.resolve_column(df["Team"], to="id")
+"""
+
+import ast
+import json
+import os
+import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(HERE)
+
+# canonical (srs_files School) -> variants used by net_files and elsewhere
+ALIASES = {
+    "Albany (NY)": ["Albany", "UAlbany"],
+    "Bowling Green State": ["Bowling Green"],
+    "Brigham Young": ["BYU"],
+    "Central Connecticut State": ["Central Connecticut"],
+    "College of Charleston": ["Charleston"],
+    "Connecticut": ["UConn"],
+    "Detroit Mercy": ["Detroit"],
+    "FDU": ["Fairleigh Dickinson"],
+    "Florida Atlantic": ["FAU", "Fla. Atlantic"],
+    "Florida Gulf Coast": ["FGCU"],
+    "Florida International": ["FIU"],
+    "Grambling": ["Grambling State"],
+    "Green Bay": ["Wisconsin-Green Bay", "UW-Green Bay"],
+    "IU Indy": ["IU Indianapolis", "IUPUI"],
+    "Illinois-Chicago": ["UIC"],
+    "Kansas City": ["UMKC"],
+    "Little Rock": ["Arkansas-Little Rock", "UALR"],
+    "Long Island University": ["Long Island", "LIU"],
+    "Louisiana State": ["LSU"],
+    "Louisiana-Monroe": ["ULM"],
+    "Loyola (IL)": ["Loyola-Chicago", "Loyola Chicago", "Loyola (Chicago)"],
+    "Loyola (MD)": ["Loyola-Maryland"],
+    "Loyola Marymount": ["Loyola-Marymount", "LMU", "LMU (CA)"],
+    "Maryland-Baltimore County": ["UMBC"],
+    "Maryland-Eastern Shore": ["Maryland Eastern Shore"],
+    "Massachusetts": ["UMass"],
+    "Massachusetts-Lowell": ["UMass-Lowell", "UMass Lowell"],
+    "McNeese State": ["McNeese"],
+    "Mississippi": ["Ole Miss"],
+    "Mount St. Mary's": ["Mount Saint Mary's"],
+    "NC State": ["North Carolina State"],
+    "Nevada-Las Vegas": ["UNLV"],
+    "Nicholls State": ["Nicholls"],
+    "North Carolina Central": ["NC Central", "N.C. Central"],
+    "Omaha": ["Nebraska Omaha", "Nebraska-Omaha"],
+    "Pennsylvania": ["Penn"],
+    "Prairie View": ["Prairie View A&M"],
+    "Presbyterian": ["Presbyterian College"],
+    "Queens (NC)": ["Queens"],
+    "SIU Edwardsville": ["SIUE"],
+    "Saint Mary's (CA)": ["Saint Mary's College"],
+    "Sam Houston": ["Sam Houston State"],
+    "Seattle": ["Seattle University"],
+    "Southeast Missouri State": ["Southeast Missouri"],
+    "Southern California": ["USC"],
+    "Southern Methodist": ["SMU"],
+    "Southern Mississippi": ["Southern Miss"],
+    "St. Bonaventure": ["Saint Bonaventure"],
+    "St. Francis (NY)": ["Saint Francis (NY)"],
+    "St. John's (NY)": ["Saint John's"],
+    "St. Thomas": ["Saint Thomas"],
+    "Tennessee-Martin": ["UT Martin"],
+    "Texas-Rio Grande Valley": ["UTRGV"],
+    "UNC Greensboro": ["UNCG"],
+    "UNC Wilmington": ["UNCW"],
+    "UT Arlington": ["UTA"],
+    "Virginia Commonwealth": ["VCU"],
+    "Utah Tech": ["Dixie State"],
+    "Houston Christian": ["Houston Baptist"],
+    "East Texas A&M": ["Texas A&M-Commerce"],
+    "UTSA": ["Texas-San Antonio", "Texas-(San Antonio)"],
+    "George Washington": ["GW"],
+    "George Mason": ["GMU"],
+    "Rhode Island": ["URI"],
+    "Saint Louis": ["SLU"],
+    "Northern Iowa": ["UNI"],
+    "South Florida": ["South Fla."],
+}
+
+_PUNCT = re.compile(r"[^a-z0-9& ]+")
+
+
+def normalize(name):
+    """Exact-match key: lowercase, punctuation -> space, St. -> saint (leading) / state (trailing)."""
+    s = _PUNCT.sub(" ", str(name).lower().replace("'", "")).split()
+    if not s:
+        return ""
+    if s[0] == "st":
+        s[0] = "saint"
+    if s[-1] == "st" and len(s) > 1:
+        s[-1] = "state"
+    return " ".join("and" if w == "&" else w for w in s)
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _literal_from(path, name):
+    """Value of a top-level `name = <literal>` assignment in a script, without running it."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == name for t in node.targets):
+            return ast.literal_eval(node.value)
+    return None
+
+
+class TeamResolver:
+    """
+    canonical: iterable of canonical team names (IDs are assigned in sorted order).
+    aliases: canonical -> list of variants.
+    min_score: minimum trigram Dice similarity for a fuzzy match.
+    """
+
+    def __init__(self, canonical, aliases=None, min_score=0.6):
+        aliases = aliases or {}
+        # a name listed as some team's variant is never a team of its own
+        variant_names = {v for team, vs in aliases.items() for v in vs if v != team}
+        self.teams = sorted((set(canonical) | set(aliases)) - variant_names)
+        self.ids = {t: i for i, t in enumerate(self.teams)}
+        self.min_score = min_score
+        self._exact = {}
+        self._mascots = set()
+        self._cache = {}
+        for team in self.teams:
+            self._add_key(team, team)
+        for team, variants in aliases.items():
+            if team not in self.ids:
+                continue
+            for v in variants:
+                self._add_key(v, team)
+        self._build_trigram_index()
+
+    def _add_key(self, variant, team):
+        key = normalize(variant)
+        if key:
+            self._exact.setdefault(key, team)
+
+    def add_mascot_name(self, full, team):
+        """Learn the mascot of a "School Mascot" name whose team is known (the words after the school)."""
+        self._cache.clear()
+        words = normalize(full).split()
+        for n in range(len(words) - 1, 0, -1):
+            if self._exact.get(" ".join(words[:n])) == team:
+                self._mascots.add(" ".join(words[n:]))
+                return
+        if len(words) > 1:
+            self._mascots.add(words[-1])  # school spelled differently ("Saint Mary's Gaels")
+
+    def add_school_mascot_names(self, names):
+        """Register a list known to be "School Mascot" names (Synergy teams_list): the longest
+        school prefix names the team, the rest is learned as its mascot."""
+        for full in names:
+            words = normalize(full).split()
+            team = next((self._exact[" ".join(words[:n])] for n in range(len(words) - 1, 0, -1)
+                         if " ".join(words[:n]) in self._exact), None)
+            if team is not None:
+                self._add_key(full, team)
+                self.add_mascot_name(full, team)
+        self._build_trigram_index()
+
+    def add_variants(self, variants):
+        """Register extra variants (resolved through the resolver itself) as exact keys."""
+        for v in variants:
+            team = self.resolve(v)
+            if team is not None:
+                self._add_key(v, team)
+        self._build_trigram_index()
+
+    def _build_trigram_index(self):
+        self._keys = list(self._exact)
+        self._key_grams = [len(_trigrams(k)) for k in self._keys]
+        postings = defaultdict(list)
+        for i, k in enumerate(self._keys):
+            for g in _trigrams(k):
+                postings[g].append(i)
+        self._postings = dict(postings)
+        self._cache.clear()
+
+    # ---- lookups ----
+    def _fuzzy(self, key):
+        grams = _trigrams(key)
+        shared = Counter()
+        for g in grams:
+            shared.update(self._postings.get(g, ()))
+        best, best_score = None, self.min_score
+        for i, n in shared.items():
+            if key.startswith(self._keys[i] + " "):
+                continue  # school plus extra words that are not a mascot: a different team
+            score = 2 * n / (len(grams) + self._key_grams[i])
+            if score > best_score:
+                best, best_score = self._exact[self._keys[i]], score
+        return best
+
+    def resolve(self, name):
+        """Canonical team name for any variant, or None if nothing is close enough."""
+        if name is None or (isinstance(name, float) and pd.isna(name)):
+            return None
+        raw = str(name).strip()
+        if raw in self._cache:
+            return self._cache[raw]
+
+        key = normalize(raw)
+        team = self._exact.get(key)
+        if team is None:
+            words = key.split()
+            for n in range(len(words) - 1, 0, -1):
+                if " ".join(words[n:]) in self._mascots:
+                    team = self._exact.get(" ".join(words[:n]))
+                    if team is not None:
+                        break
+        if team is None and key:
+            team = self._fuzzy(key)
+        self._cache[raw] = team
+        return team
+
+    def team_id(self, name):
+        team = self.resolve(name)
+        return self.ids[team] if team is not None else None
+
+    def resolve_column(self, values, to="name"):
+        """Resolve a whole column: each distinct value once, then one take over the codes."""
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        resolved = [self.resolve(u) for u in uniques]
+        if to == "id":
+            resolved = [self.ids[t] if t is not None else pd.NA for t in resolved]
+            out = pd.array(resolved, dtype="Int64").take(codes, allow_fill=True)
+        else:
+            out = pd.array(resolved, dtype="string").take(codes, allow_fill=True)
+        index = values.index if isinstance(values, pd.Series) else None
+        return pd.Series(out, index=index)
+
+    def unresolved(self, values):
+        """Distinct values that resolve to nothing (what would silently drop out of a merge)."""
+        return sorted(v for v in pd.unique(pd.Series(values).dropna()) if self.resolve(v) is None)
+
+    # ---- construction from the repo's mapping files ----
+    @classmethod
+    def default(cls, min_score=0.6):
+        canonical = set()
+        for folder, col in (("srs_files", "School"), ("net_files", "Team")):
+            path = os.path.join(HERE, folder)
+            for f in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+                if f.endswith(".csv"):
+                    canonical |= set(pd.read_csv(os.path.join(path, f), usecols=[col])[col].str.strip())
+
+        aliases = {team: list(v) for team, v in ALIASES.items()}
+        norm_path = os.path.join(HERE, "team_normalization.json")
+        if os.path.exists(norm_path):
+            with open(norm_path) as f:
+                for team, info in json.load(f).items():
+                    canonical.add(team)
+                    aliases.setdefault(team, []).extend(info.get("aliases", []))
+        manual = _literal_from(os.path.join(HERE, "srs_net_mapping.py"), "manual_groups") or {}
+        for team, variants in manual.items():
+            aliases.setdefault(team, []).extend(variants)
+
+        # NET spellings of an SRS school are variants, not teams of their own (see __init__)
+        resolver = cls(canonical, aliases, min_score=min_score)
+
+        # "School Mascot" style names: mascot stripping / the variant on the other side resolves them
+        name_map = _literal_from(os.path.join(REPO, "Big Defense 0616", "preprocess.py"), "team_name_map") or {}
+        for short, full in name_map.items():
+            team = resolver.resolve(short) or resolver.resolve(full)
+            if team is not None:
+                resolver._add_key(short, team)
+                resolver._add_key(full, team)
+                resolver.add_mascot_name(full, team)
+        resolver.add_school_mascot_names(_literal_from(os.path.join(REPO, "WCC_ranks.py"), "teams_list") or [])
+
+        mapping_path = os.path.join(HERE, "team_name_mapping.json")
+        if os.path.exists(mapping_path):
+            with open(mapping_path) as f:
+                resolver.add_variants(json.load(f).keys())
+        return resolver
+
+
+if __name__ == "__main__":
+    resolver = TeamResolver.default()
+    for name in ["LMU (CA)", "Loyola-Marymount", "LMU", "Loyola Marymount Lions", "Oregon St.", "Saint Mary's Gaels", "Kansas State"]:
+        print(f"{name!r:28} -> {resolver.resolve(name)}")
@@ -0,0 +1,163 @@
+"""
+tournament_sim.py
+
+Monte Carlo conference-tournament odds from the composite ratings (srs_5years /
+net_5years calculate_weighted_averages output).
+
+A bracket is a nested pair structure of team names; None is a bye:
+    (("Gonzaga", None), (("Pacific", "Pepperdine"), "Santa Clara"))
+standard_bracket(seeds) builds the usual single-elimination layout with byes to the top seeds.
+
+Every simulation is one array slot: each game is evaluated once for all n_sims at a time
+(winner index arrays of shape (n_sims,)), so the Python work is one step per game in the
+bracket, never per simulation. Win probability is logistic in the rating difference
+(SRS points): p = 1 / (1 + exp(-diff / scale)); scale 6.1 is close to a normal model with
+an 11-point game standard deviation.
+
+Composite scores are not in points, so composite_ratings() maps them onto SRS points with a
+linear fit against mean_srs (NET composites use 100 - mean_normalized_rank, fitted against
+an SRS reference).
+
+Call:
+    from conference_history import ConferenceHistory
+    from tournament_sim import composite_ratings, conference_odds, simulate, standard_bracket
+
+    ratings = composite_ratings(srs_team_stats)
+    odds = simulate(standard_bracket(seeds), ratings, n_sims=100_000)
+    wcc = conference_odds(ratings, history, ["WCC"])
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SCALE = 6.1  # logistic scale in SRS points
+
+
+def composite_ratings(team_stats, column=None, reference=None):
+    """
+    Team ratings in SRS points from a composite table.
+    column: rating column; default composite_score (SRS composite) or 100 - mean_normalized_rank (NET).
+    reference: SRS points per team to fit against; default team_stats["mean_srs"].
+    """
+    if column is not None:
+        raw = team_stats[column].astype(float)
+    elif "composite_score" in team_stats.columns:
+        raw = team_stats["composite_score"].astype(float)
+    else:
+        raw = 100 - team_stats["mean_normalized_rank"].astype(float)
+    if reference is None:
+        if "mean_srs" not in team_stats.columns:
+            raise ValueError("need a reference (e.g. SRS mean_srs by team) to put these ratings in points")
+        reference = team_stats["mean_srs"]
+    both = pd.concat([raw, reference.astype(float)], axis=1, join="inner").dropna()
+    slope, intercept = np.polyfit(both.iloc[:, 0], both.iloc[:, 1], 1)
+    return (intercept + slope * raw).rename("rating")
+
+
+def standard_bracket(seeds):
+    """Single-elimination bracket for teams listed best seed first; top seeds get the byes."""
+    size = 1
+    while size < len(seeds):
+        size *= 2
+    order = [1]
+    while len(order) < size:
+        n = 2 * len(order)
+        order = [s for seed in order for s in (seed, n + 1 - seed)]
+    slots = [seeds[s - 1] if s <= len(seeds) else None for s in order]
+    while len(slots) > 1:
+        slots = [(slots[i], slots[i + 1]) for i in range(0, len(slots), 2)]
+    return slots[0]
+
+
+def _teams(node):
+    if node is None:
+        return []
+    if isinstance(node, tuple):
+        return _teams(node[0]) + _teams(node[1])
+    return [node]
+
+
+def _depth(node):
+    return 1 + max(_depth(node[0]), _depth(node[1])) if isinstance(node, tuple) else 0
+
+
+def simulate(bracket, ratings, n_sims=100_000, scale=DEFAULT_SCALE, seed=0):
+    """
+    Round-advancement probabilities for every team in the bracket.
+    ratings: Series team -> rating in points. Returns one row per team with p_round_1 ..
+    p_round_D (reached that round; byes count as reached) and p_champion.
+    """
+    teams = _teams(bracket)
+    missing = [t for t in teams if t not in ratings.index]
+    if missing:
+        raise KeyError(f"no rating for {missing}")
+    r = ratings.reindex(teams).to_numpy(dtype=float)
+    rounds = _depth(bracket)
+    reach = np.zeros((len(teams), rounds + 1))
+    rng = np.random.default_rng(seed)
+    index = {t: i for i, t in enumerate(teams)}
+
+    def play(node, level):
+        # level 0 is the final, played in round `rounds`
+        if not isinstance(node, tuple):
+            i = index[node]
+            reach[i, : rounds - level + 1] = n_sims  # every round up to the one this team enters
+            return np.full(n_sims, i)
+        a, b = node
+        if a is None or b is None:
+            winner = play(b if a is None else a, level + 1)
+        else:
+            wa, wb = play(a, level + 1), play(b, level + 1)
+            p = 1 / (1 + np.exp(-(r[wa] - r[wb]) / scale))
+            winner = np.where(rng.random(n_sims) < p, wa, wb)
+        reach[:, rounds - level] += np.bincount(winner, minlength=len(teams))
+        return winner
+
+    play(bracket, 0)
+    out = pd.DataFrame(
+        reach / n_sims,
+        index=pd.Index(teams, name="team"),
+        columns=[f"p_round_{k}" for k in range(1, rounds + 1)] + ["p_champion"],
+    )
+    out.insert(0, "rating", r)
+    out.attrs["n_sims"] = n_sims
+    return out.sort_values("p_champion", ascending=False)
+
+
+def conference_odds(ratings, history, conferences, season=None, n_sims=100_000, scale=DEFAULT_SCALE, seed=0):
+    """
+    Title odds for each conference: members from the conference history (latest season by
+    default), seeded by rating into a standard bracket. Conferences with fewer than two
+    rated members that season are skipped.
+    """
+    season = season or history.seasons[-1]
+    frames = []
+    for k, conf in enumerate(conferences):
+        members = [t for t in history.members(conf, season) if t in ratings.index]
+        if len(members) < 2:
+            continue  # conference gone (Pac-12 after realignment) or unrated
+        seeds = list(ratings.reindex(members).sort_values(ascending=False).index)
+        odds = simulate(standard_bracket(seeds), ratings, n_sims=n_sims, scale=scale, seed=seed + k)
+        odds.insert(0, "seed", odds.index.map({t: s + 1 for s, t in enumerate(seeds)}))
+        odds.insert(0, "conference", conf)
+        frames.append(odds.reset_index())
+    out = pd.concat(frames, ignore_index=True)
+    # brackets of different depth: round columns in order, NaN for rounds a smaller bracket lacks
+    round_cols = sorted((c for c in out.columns if c.startswith("p_round_")), key=lambda c: int(c.rsplit("_", 1)[1]))
+    return out[["team", "conference", "seed", "rating"] + round_cols + ["p_champion"]]
+
+
+if __name__ == "__main__":
+    import time
+
+    from conference_history import ConferenceHistory
+    from season_panel import ingest, srs_frame
+    from srs_5years import calculate_weighted_averages, weights
+
+    combined = srs_frame(ingest())
+    ratings = composite_ratings(calculate_weighted_averages(combined, weights))
+    history = ConferenceHistory.from_frame(combined)
+    start = time.perf_counter()
+    odds = conference_odds(ratings, history, ["WCC", "Big East", "SEC"], n_sims=200_000)
+    print(f"{len(odds)} teams in {time.perf_counter() - start:.2f}s")
+    print(odds[odds["conference"] == "WCC"].round(3).to_string(index=False))
@@ -0,0 +1,116 @@
+"""
+weight_sweep.py
+
+Sensitivity of the 5-year composite SRS rankings (srs_5years.calculate_weighted_averages)
+to its two hand-picked choices: the season weights [0.10, 0.15, 0.20, 0.25, 0.30] and the
+50/50 rank / SRS blend.
+
+The composite is linear in both, so with teams x seasons matrices
+    R = 100 - normalized_rank,  S = normalized_srs    (0 where a team has no season, as in the sum)
+every (weights w, blend b) candidate is
+    composite = b * (R @ w) + (1 - b) * (S @ w)
+and a whole sweep is two matrix multiplies (R @ W, S @ W) plus a broadcast over blends.
+Ranks for every candidate come from one argsort over the teams axis.
+
+Call:
+    from srs_5years import process_srs_data
+    from weight_sweep import sweep
+
+    combined = process_srs_data("srs_files")
+    stability = sweep(combined, n_weights=2000, blends=[0.3, 0.4, 0.5, 0.6, 0.7], top_n=(10, 25))
+"""
+
+import numpy as np
+import pandas as pd
+
+from srs_5years import season_years, weights as base_weights
+
+
+def team_season_matrices(combined_df, seasons=season_years):
+    """
+    Teams x seasons matrices (R, S) of inverted normalized rank and normalized SRS.
+    Returns (teams index, R, S); missing team-seasons are 0 so they add nothing to the composite.
+    """
+    df = combined_df.assign(
+        inv_rank=100 - combined_df["normalized_rank"].astype(float),
+        norm_srs=combined_df["normalized_srs"].astype(float),
+    )
+    df["season"] = df["season"].astype(str)
+    # duplicate (team, season) rows sum, exactly like the groupby('team').sum() in srs_5years
+    R = df.pivot_table(index="team", columns="season", values="inv_rank", aggfunc="sum", fill_value=0.0)
+    S = df.pivot_table(index="team", columns="season", values="norm_srs", aggfunc="sum", fill_value=0.0)
+    R = R.reindex(columns=list(seasons), fill_value=0.0)
+    S = S.reindex(index=R.index, columns=list(seasons), fill_value=0.0)
+    return R.index, R.to_numpy(dtype=float), S.to_numpy(dtype=float)
+
+
+def sample_weights(n, n_seasons=len(season_years), concentration=2.0, monotone=True, seed=0):
+    """
+    n candidate season-weight vectors (seasons x n matrix, columns sum to 1) from a Dirichlet.
+    monotone: sort each draw ascending so later seasons never weigh less than earlier ones
+      (the assumption behind the hand-picked weights).
+    """
+    rng = np.random.default_rng(seed)
+    W = rng.dirichlet(np.full(n_seasons, concentration), size=n)
+    if monotone:
+        W = np.sort(W, axis=1)
+    return W.T
+
+
+def composite_scores(R, S, W, blends):
+    """teams x (n_weights * n_blends) composites; column j * n_blends + k is weights j with blend k."""
+    RW, SW = R @ W, S @ W  # (teams, n_weights)
+    b = np.asarray(blends, dtype=float)
+    C = RW[:, :, None] * b + SW[:, :, None] * (1 - b)
+    return C.reshape(R.shape[0], -1)
+
+
+def rank_columns(C):
+    """1 = best rank of every team in every column (ties broken by team order, like a stable sort)."""
+    order = np.argsort(-C, axis=0, kind="stable")
+    ranks = np.empty_like(order, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, C.shape[0] + 1, dtype=np.int32)[:, None], axis=0)
+    return ranks
+
+
+def sweep(combined_df, W=None, n_weights=2000, blends=(0.3, 0.4, 0.5, 0.6, 0.7), top_n=(10, 25), seed=0):
+    """
+    Rank-stability table over every (weights, blend) candidate.
+
+    W: seasons x n candidate weights; default is n_weights Dirichlet draws plus the hand-picked weights.
+    Returns one row per team with its baseline composite rank (hand-picked weights, 50/50 blend),
+    median / best / worst rank and range across the sweep, and P(top N) for each N in top_n.
+    """
+    teams, R, S = team_season_matrices(combined_df)
+    if W is None:
+        W = np.column_stack([np.asarray(base_weights, dtype=float), sample_weights(n_weights, R.shape[1], seed=seed)])
+
+    ranks = rank_columns(composite_scores(R, S, W, blends))
+    baseline = rank_columns(composite_scores(R, S, np.asarray(base_weights, dtype=float)[:, None], [0.5]))[:, 0]
+
+    out = pd.DataFrame(
+        {
+            "baseline_rank": baseline,
+            "median_rank": np.median(ranks, axis=1),
+            "best_rank": ranks.min(axis=1),
+            "worst_rank": ranks.max(axis=1),
+        },
+        index=teams,
+    )
+    out["rank_range"] = out["worst_rank"] - out["best_rank"]
+    for n in top_n:
+        out[f"p_top{n}"] = (ranks <= n).mean(axis=1)
+    out.attrs["n_candidates"] = ranks.shape[1]
+    return out.sort_values(["baseline_rank"])
+
+
+if __name__ == "__main__":
+    import time
+
+    from srs_5years import process_srs_data
+
+    combined = process_srs_data("srs_files")
+    start = time.perf_counter()
+    stability = sweep(combined)
+    print(f"{stability.attrs['n_candidates']} candidates in {time.perf_counter() - start:.2f}s")
+    print(stability.head(25).round(3))
@@ -1,6 +1,28 @@
-import pandas as pd
+"""
+WCC_ranks.py
+
+Conference benchmarking for Synergy play-type exports (one CSV per play type in `folder`,
+e.g. LMU/Transition.csv, LMU/Spot Up.csv).
+
+Every play-type CSV is read once into a single table indexed by (play_type, Team) -- all
+D1 teams in the exports, not just teams_list. Ranks and percentiles for every numeric metric
+in every play type come from one grouped rank over that table, within teams_list, any other
+team list, or per conference when given a team -> conference mapping. The report is one
+consolidated table with the user team highlighted, instead of one printout per file.
+
+Call:
+    from WCC_ranks import load_playtypes, benchmark, consolidated_report, user_summary
+
+    table = load_playtypes("LMU")
+    bench = benchmark(table, teams=teams_list)                 # ranks within the WCC list
+    bench_all = benchmark(table, groups=team_to_conference)    # every team within its conference
+    print(user_summary(bench, user_team))
+"""
+
 import os
 
+import pandas as pd
+
 # Define the list of teams you're interested in
 teams_list = [
     "Portland Pilots",
@@ -17,58 +39,107 @@ teams_list = [
     "Seattle Redhawks"
 ]
 user_team = "Loyola Marymount Lions"
-print('\n'*20)
-
 folder = "LMU"
-# Loop through each file in the file paths
-for file_name in os.listdir(folder):
-    if file_name.endswith('.csv'):
-        full_path = os.path.join(folder, file_name)
-    # Load the CSV file
-
-    df = pd.read_csv(full_path, sep=',')
-    
-    # Filter the DataFrame to only include rows where 'Team' is in the teams_list
-    df_filtered = df[df['Team'].isin(teams_list)]
-    
-    # Sort the filtered DataFrame by 'PPP' in descending order
-    df_sorted = df_filtered.sort_values(by='%Time', ascending=False)
-    
-    # Highlight the user team
-    df_sorted['Highlight'] = df_sorted['Team'].apply(lambda x: 'Yes' if x == user_team else '   ')
-
-
-
-     #Move the 'Highlight' column to the third position
-    # Get the list of columns
-    cols = df_sorted.columns.tolist()
-
-    # Remove 'Highlight' from the list (if it exists)
-    if 'Highlight' in cols:
-        cols.remove('Highlight')
-
-    # Insert 'Highlight' at the third position (index 2)
-    cols.insert(2, 'Highlight')
-
-    removecols = ['Eligibility Year', 'Height']
-    for col in removecols:
-        if col in cols:
-            cols.remove(col)
-    # Reorder the DataFrame
-    df_sorted = df_sorted[cols]
-    df_sorted = df_sorted.sort_values(by=['Poss'],ascending = True)
-
-    # Reset index if desired (optional)
-    df_sorted.reset_index(drop=True, inplace=True)
-    
-    # Display or save the sorted DataFrame
-    print(f"Results for {file_name}:")
-    print(df_sorted,'\n')
-    
-    # To save the sorted data to a new CSV
-    # Output file name based on the input file
-    #output_file = file_name.replace(".csv", "_filtered_sorted.csv")
-    #df_sorted.to_csv(output_file, index=False)
-    #print(f"Saved to {output_file}")
-
-#draw a scatter. find an elite region. so teams have to be above ppp and time%
\ No newline at end of file
+
+removecols = ['Eligibility Year', 'Height']
+LOWER_IS_BETTER = ('%TO',)  # metrics where a smaller value ranks first
+TEXT_COLS = ('Team', 'Player', 'play_type')
+
+
+def _numeric(df):
+    """Synergy percent / count columns exported as text ("25.3%", "1,024") -> floats."""
+    for col in df.columns:
+        if col in TEXT_COLS or pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        converted = pd.to_numeric(df[col].astype(str).str.replace(',', '').str.rstrip('%'), errors='coerce')
+        if converted.notna().sum() >= df[col].notna().sum() * 0.9:
+            df[col] = converted
+    return df
+
+
+def load_playtypes(folder=folder):
+    """Every play-type CSV in the folder, read once, as one table indexed by (play_type, Team)."""
+    frames = []
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith('.csv'):
+            continue
+        df = pd.read_csv(os.path.join(folder, file_name), sep=',')
+        df = df.drop(columns=[c for c in removecols if c in df.columns])
+        df['play_type'] = os.path.splitext(file_name)[0]
+        frames.append(_numeric(df))
+    table = pd.concat(frames, ignore_index=True)
+    table['Team'] = table['Team'].astype(str).str.strip()
+    return table.set_index(['play_type', 'Team']).sort_index()
+
+
+def benchmark(table, teams=None, groups=None, metrics=None, lower_is_better=LOWER_IS_BETTER):
+    """
+    Rank (1 = best) and percentile (1.0 = best) of every metric in every play type, in one
+    grouped pass.
+    teams: only rank among these teams (default: every team in the table).
+    groups: team -> group label (e.g. conference); ranks are then within (play type, group).
+    metrics: numeric columns to rank (default: all numeric columns except Synergy's own Rank).
+    """
+    bench = table
+    if teams is not None:
+        bench = bench[bench.index.get_level_values('Team').isin(teams)]
+    if metrics is None:
+        metrics = [c for c in bench.select_dtypes('number').columns if c != 'Rank']
+    bench = bench.copy()
+
+    keys = [bench.index.get_level_values('play_type')]
+    if groups is not None:
+        bench['group'] = bench.index.get_level_values('Team').map(groups)
+        bench = bench[bench['group'].notna()]
+        keys = [bench.index.get_level_values('play_type'), bench['group']]
+
+    # flip lower-is-better metrics so one descending rank covers every column
+    signed = bench[metrics].copy()
+    flip = [m for m in metrics if m in lower_is_better]
+    signed[flip] = -signed[flip]
+    grouped = signed.groupby(keys)
+    ranks = grouped.rank(ascending=False, method='min')
+    pcts = grouped.rank(ascending=True, method='average', pct=True)
+
+    for m in metrics:
+        bench[f'{m}_rank'] = ranks[m]
+        bench[f'{m}_pct'] = pcts[m]
+    bench['teams_ranked'] = grouped[metrics[0]].transform('size')
+    return bench
+
+
+def consolidated_report(bench, user_team=user_team, sort_by='Poss'):
+    """One long table over all play types, user team flagged in the third column."""
+    report = bench.reset_index()
+    report.insert(2, 'Highlight', (report['Team'] == user_team).map({True: 'Yes', False: '   '}))
+    if sort_by in report.columns:
+        report = report.sort_values(['play_type', sort_by], ascending=[True, True])
+    return report.reset_index(drop=True)
+
+
+def user_summary(bench, user_team=user_team, metrics=('%Time', 'Poss', 'PPP')):
+    """The user team's value, rank and percentile for each metric, one row per play type."""
+    rows = bench.xs(user_team, level='Team')
+    cols = []
+    for m in metrics:
+        cols += [c for c in (m, f'{m}_rank', f'{m}_pct') if c in rows.columns]
+    return rows[cols + ['teams_ranked']]
+
+
+if __name__ == "__main__":
+    print('\n' * 20)
+    table = load_playtypes(folder)
+    bench = benchmark(table, teams=teams_list)
+
+    pd.set_option('display.width', 200)
+    for play_type, block in consolidated_report(bench).groupby('play_type', sort=False):
+        print(f"Results for {play_type}:")
+        print(block.drop(columns='play_type').reset_index(drop=True), '\n')
+
+    print(f"{user_team} across play types:")
+    print(user_summary(bench).round(3))
+
+    # To save the consolidated report
+    #consolidated_report(bench).to_csv("wcc_playtype_report.csv", index=False)
+
+#draw a scatter. find an elite region. so teams have to be above ppp and time%